@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+
+"""benchmark.py: Snakeskin performance benchmarks
+
+Measures Snakeskin's own overhead without Metasploit. A scriptable msfvenom stub is placed on the PATH that replays recorded --help, --list and
+--list-options output on stdout and stderr at scaled payload counts, and every stage Snakeskin performs between MsfVenom calls is timed against those recordings. Results are
+compared with stored baselines and any stage that slows down beyond the tolerance fails the run. Before timing, the parsers, search and local formatters are checked
+against the replayed output, so a stage that is fast but wrong fails the run as well.
+
+This program is free software. You can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License or (at your option) any later version.
+"""
+
+from argparse import ArgumentParser
+from base64 import b64decode
+from hashlib import sha256
+from io import StringIO
+from json import dump, load
+from math import ceil
+from os import chmod, environ, makedirs, pathsep
+from os.path import abspath, dirname, join
+from re import findall
+from shutil import rmtree
+from subprocess import DEVNULL, run
+from sys import executable
+from tempfile import mkdtemp
+from time import perf_counter
+
+from snakeskin_v1_0_0 import (
+    FakeBackend, Menu, MenuRenderer, SearchIndex, SubprocessBackend, build_command, listing_parsers, local_formats, new_menus, parse_help, parse_payload_options,
+    specific_menus
+)
+
+sample_payload = "windows/x64/meterpreter/reverse_tcp"
+
+session_input = "\n1\ns\nwindows x64 meterpreter reverse_tcp\n1\ny\nb\n2\n10.0.0.1\na\nn\np\ng\nq\n"
+
+stub = """#!{python}
+from hashlib import sha256
+from os.path import isfile, join
+from sys import argv, stderr, stdout
+
+arguments = argv[1:]
+recording = join({recordings!r}, sha256(("--list-options" if "--list-options" in arguments else " ".join(arguments)).encode()).hexdigest())
+
+if isfile(recording):
+
+    for suffix, stream in [("", stdout), (".stderr", stderr)]:
+
+        with open(recording + suffix) as replay:
+            stream.write(replay.read().replace("{{payload}}", arguments[arguments.index("-p") + 1] if "-p" in arguments else ""))
+
+elif "-o" in arguments:
+
+    with open(arguments[arguments.index("-o") + 1], "wb") as artifact:
+        artifact.write(bytes(512))
+
+    print("No encoder specified, outputting raw payload\\nPayload size: 512 bytes\\nSaved as: " + arguments[arguments.index("-o") + 1], file = stderr)
+"""
+
+def benchmark(size, directory, repeat):
+    recordings = record(size, directory)
+    check(size, directory)
+    payloads = list(listing_parsers["payload"][1](recordings["--list payloads"].split("\n")))
+    schema = parse_payload_options(recordings["--list-options"].replace("{payload}", sample_payload).split("\n"))
+    menus = new_menus({"help": parse_help(recordings["--help"])})
+    menus["generic"].set("payload", sample_payload)
+
+    for menu in ["basic", "advanced", "evasion"]:
+        menus[menu] = Menu(menu, schema[menu])
+
+    menus["basic"].set("LHOST", "10.0.0.1")
+    warm_renderer = MenuRenderer(StringIO(), False)
+    render(warm_renderer, payloads, menus)
+
+    stages = {
+        "help": lambda: parse_help(recordings["--help"]),
+        "listings": lambda: [list(parser(recordings["--list " + command].split("\n"))) for command, parser in listing_parsers.values()],
+        "options": lambda: parse_payload_options(recordings["--list-options"].replace("{payload}", sample_payload).split("\n")),
+        "search": lambda: search(payloads),
+        "render-cold": lambda: render(MenuRenderer(StringIO(), False), payloads, menus),
+        "render-cached": lambda: render(warm_renderer, payloads, menus),
+        "command": lambda: [build_command(menus, "payload" + str(number) + ".bin") for number in range(1000)],
+        "startup": lambda: session(directory, "\nq\n"),
+        "session": lambda: session(directory, session_input)
+    }
+
+    return {stage: round(min(timed(function) for _ in range(repeat)), 6) for stage, function in stages.items()}
+
+def check(size, directory):
+    path = environ.get("PATH", "")
+    environ["PATH"] = directory + pathsep + path
+
+    try:
+        backend = SubprocessBackend()
+        schema = parse_payload_options(backend.stream(["--list-options", "-p", sample_payload]))
+        payloads = list(listing_parsers["payload"][1](backend.stream(["--list", "payloads"])))
+    finally:
+        environ["PATH"] = path
+
+    options = {menu: {row[0]: row for row in schema[menu]} for menu in specific_menus}
+    exact, exact_fuzzy = SearchIndex(payloads).search("windows x64 meterpreter reverse_tcp")
+    near, near_fuzzy = SearchIndex(payloads).search("lnx shl rvrs")
+    data = bytes(range(256))
+    escaped = ["bash", "c", "perl", "python", "ruby"]
+    literals = ["csharp", "num", "powershell"]
+
+    expectations = {
+        "options header": ([schema["architecture"], schema["platform"]], ["x64", "Windows"]),
+        "options split by table order": ([list(options[menu])[:2] for menu in specific_menus], [["EXITFUNC", "LHOST"], ["AutoLoadStdapi", "MeterpreterDebugLogging"], []]),
+        "overflowing option name": (
+            options["basic"].get("ReverseListenerBindAddress"),
+            ["ReverseListenerBindAddress", "", False, "The specific IP address to bind to on the local system"]
+        ),
+        "wrapped option description": (
+            options["advanced"].get("MeterpreterDebugLogging", [""])[-1],
+            "The Meterpreter debug logging configuration, see https://github.com/rapid7/metasploit-framework/wiki/Meterpreter-Debugging"
+        ),
+        "payload listing": (payloads, [payload for payload in FakeBackend(size).payloads() if "generic/" not in payload]),
+        "exact search": ([exact[:1], exact_fuzzy], [[sample_payload], False]),
+        "fuzzy search": ([near_fuzzy, near[0].startswith("linux/") and "shell" in near[0] and "reverse" in near[0] if near else False], [True, True]),
+        "escaped formats": (
+            {name: bytes(int(byte, 16) for byte in findall(r"\\x([0-9a-f]{2})", local_formats[name](data, "buf"))) for name in escaped},
+            dict.fromkeys(escaped, data)
+        ),
+        "literal formats": ({name: bytes(int(byte, 16) for byte in findall("0x([0-9a-f]+)", local_formats[name](data, "buf"))) for name in literals}, dict.fromkeys(literals, data)),
+        "encoded formats": ([b64decode(local_formats["base64"](data, "buf")), bytes.fromhex(local_formats["hex"](data, "buf"))], [data, data])
+    }
+
+    failures = [name + ": expected " + repr(expected) + ", got " + repr(actual) for name, (actual, expected) in expectations.items() if actual != expected]
+
+    if failures:
+        raise SystemExit("\nBehaviour checks failed for " + str(size) + " payloads:\n" + "\n".join(failures))
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    print("\n" + "Size".rjust(8) + "  " + "Stage".ljust(14) + "Seconds".rjust(12) + "Baseline".rjust(12) + "Change".rjust(10))
+    print("-" * 56)
+
+    for size, stages in results.items():
+
+        for stage, seconds in stages.items():
+            expected = baseline.get(size, {}).get(stage)
+            change = ""
+
+            if expected:
+                change = str(round((seconds / expected - 1) * 100)) + "%"
+
+                if seconds > expected * (1 + tolerance) + 0.001:
+                    regressions.append(size + " " + stage)
+                    change += " SLOWER"
+
+            print(size.rjust(8) + "  " + stage.ljust(14) + str(round(seconds, 6)).rjust(12) + str(expected or "-").rjust(12) + change.rjust(10))
+
+    return regressions
+
+def main():
+    parser = ArgumentParser(description = "Snakeskin performance benchmarks")
+    parser.add_argument("--baseline", default = join(dirname(abspath(__file__)), "benchmark_baseline.json"), help = "baseline file to compare against")
+    parser.add_argument("--repeat", type = int, default = 3, help = "number of runs per stage; the fastest is reported")
+    parser.add_argument("--save", action = "store_true", help = "store these results as the new baseline instead of comparing")
+    parser.add_argument("--sizes", default = "1000,10000,100000", help = "comma-separated numbers of fake payloads to benchmark")
+    parser.add_argument("--tolerance", type = float, default = 0.5, help = "allowed slowdown relative to the baseline (default: 0.5 for 50%%)")
+    arguments = parser.parse_args()
+    directory = mkdtemp(prefix = "snakeskin-benchmark-")
+
+    try:
+        results = {}
+
+        for size in [int(size) for size in arguments.sizes.split(",")]:
+            print("Benchmarking " + str(size) + " payloads...")
+            results[str(size)] = benchmark(size, directory, max(1, arguments.repeat))
+
+    finally:
+        rmtree(directory, ignore_errors = True)
+
+    if arguments.save:
+
+        with open(arguments.baseline, "w") as baseline:
+            dump(results, baseline, indent = 4)
+            baseline.write("\n")
+
+        compare(results, {}, arguments.tolerance)
+        print("\nBaseline saved to '" + arguments.baseline + ".'")
+        return
+
+    try:
+
+        with open(arguments.baseline) as baseline:
+            baseline = load(baseline)
+
+    except OSError:
+        baseline = {}
+
+    regressions = compare(results, baseline, arguments.tolerance)
+
+    if regressions:
+        raise SystemExit("\nPerformance regressions beyond " + str(round(arguments.tolerance * 100)) + "%: " + ", ".join(regressions) + ".")
+
+    print("\nNo performance regressions" + ["", " (no baseline found)"][not baseline] + ".")
+
+def record(size, directory):
+    backend = FakeBackend(size)
+    commands = {"--help": ["--help"], "--list-options": ["--list-options", "-p", sample_payload]}
+    commands.update({"--list " + command: ["--list", command] for command, _ in listing_parsers.values()})
+    recordings = {}
+    makedirs(join(directory, "recordings"), exist_ok = True)
+
+    for key, arguments in commands.items():
+        streams = [output.replace(sample_payload, "{payload}") if key == "--list-options" else output for output in backend.output(arguments)]
+        recordings[key] = streams[0]
+
+        for suffix, output in zip(["", ".stderr"], streams):
+
+            with open(join(directory, "recordings", sha256(key.encode()).hexdigest() + suffix), "w") as recording:
+                recording.write(output)
+
+    with open(join(directory, "msfvenom"), "w") as replayer:
+        replayer.write(stub.format(python = executable, recordings = join(directory, "recordings")))
+
+    chmod(join(directory, "msfvenom"), 0o755)
+    return recordings
+
+def render(renderer, payloads, menus):
+    footer = "Page: [N]ext, [P]revious | Other: [S]earch, [C]lear, [R]eturn, [Q]uit."
+
+    for page in range(1, min(ceil(len(payloads) / 30), 100) + 1):
+        renderer.display_menu(payloads, page, "Payload Subm", footer, "No search string set. Displaying all available options.")
+
+    for menu in menus.values():
+        renderer.display_menu(menu, 1, menu.name.title() + " Options M", footer, "")
+
+def search(payloads):
+    index = SearchIndex(payloads)
+
+    for query in ["w", "wi", "win", "windows", "windows x64", "windows x64 meterpreter", "reverse_tcp", "linux shell", "lnx shl rvrs"]:
+        index.search(query)
+
+def session(directory, keystrokes):
+    cache = mkdtemp(dir = directory)
+
+    run(
+        [executable, join(dirname(abspath(__file__)), "snakeskin_v1_0_0.py"), "--backend", "subprocess"],
+        input = keystrokes,
+        stdout = DEVNULL,
+        stderr = DEVNULL,
+        text = True,
+        check = True,
+        cwd = cache,
+        env = dict(environ, PATH = directory + pathsep + environ.get("PATH", ""), XDG_CACHE_HOME = cache),
+        start_new_session = True
+    )
+
+def timed(function):
+    started = perf_counter()
+    function()
+    return perf_counter() - started
+
+if __name__ == "__main__":
+    main()
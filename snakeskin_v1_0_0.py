@@ -7,6 +7,9 @@ with MsfVenom in real time to obtain generic and payload-specific options and th
 modify its value through either freeform data entry or searchable, paginated submenus. Finally, Snakeskin teaches MsfVenom syntax by giving the user the
 opportunity to compare the MsfVenom command issued at the command prompt to feedback received from MsfVenom.
 
+Snakeskin can also be imported. The Snakeskin class exposes listings, payload options, validation, command building and payload generation without any prompts,
+and AsyncSnakeskin offers the same calls as asyncio coroutines so that many queries and generations can be in flight at once.
+
 This program is free software. You can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software
 Foundation, either version 3 of the License or (at your option) any later version.
 
@@ -23,124 +26,1864 @@ __status__ = "Production"
 __version__ = "1.0.0"
 __year__ = "2023"
 
-from getpass import getpass
-from itertools import accumulate
-from math import ceil
-from os.path import isfile
-from random import choice
-from re import sub
-from subprocess import getoutput
+from argparse import ArgumentParser
+from asyncio import CancelledError, get_running_loop
+from atexit import register
+from base64 import b64encode
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError, as_completed, wait
+from getpass import getpass
+from functools import lru_cache, partial
+from hashlib import sha256
+from itertools import count
+from json import dump, dumps, load, loads
+from math import ceil
+from os import cpu_count, environ, getcwd, getpid, kill, killpg, makedirs, remove, replace, walk
+from os.path import dirname, expanduser, getmtime, getsize, isdir, isfile, join, realpath, splitext
+from random import choice
+from re import finditer, fullmatch, search, split
+from shlex import quote
+from shutil import copyfile, get_terminal_size, which
+from signal import SIGKILL, SIGTERM
+from subprocess import DEVNULL, PIPE, CalledProcessError, Popen, TimeoutExpired
+from sys import stdout
+from threading import BoundedSemaphore, Event, Lock, Thread, Timer, current_thread
+from time import perf_counter, time
+
+try:
+    from resource import RLIMIT_AS, prlimit
+except ImportError:
+    prlimit = None
+
+try:
+    from tomllib import load as load_toml
+except ImportError:
+    load_toml = None
+
+format_aliases = {"pl": "perl", "ps1": "powershell", "py": "python", "rb": "ruby", "sh": "bash"}
+
+format_extensions = {"base64": "b64", "bash": "sh", "csharp": "cs", "num": "txt", "perl": "pl", "powershell": "ps1", "python": "py", "raw": "bin", "ruby": "rb"}
+
+listing_parsers = {
+    "architecture": ("archs", lambda lines: (record["Name"] for record in parse_table(lines))),
+    "encoder": ("encoders", lambda lines: (record["Name"] for record in parse_table(lines))),
+    "encrypt": ("encrypts", lambda lines: (record["Name"] for record in parse_table(lines))),
+    "format": ("formats", lambda lines: sorted(record["Name"] for record in parse_table(lines))),
+    "payload": ("payloads", lambda lines: (record["Name"] for record in parse_table(lines) if "generic/" not in record["Name"])),
+    "platform": ("platforms", lambda lines: (record["Name"] for record in parse_table(lines)))
+}
+
+local_formats = {
+    "base64": lambda data, name: b64encode(data).decode(),
+    "bash": lambda data, name: hexify(data, "$'", "'\\", "export " + name + "=\\\n", "'"),
+    "c": lambda data, name: hexify(data, '"', '"', "unsigned char " + name + "[] = \n", '";'),
+    "csharp": lambda data, name: (
+        "byte[] " + name + " = new byte[" + str(len(data)) + "] {"
+        + ",".join([["", "\n"][index % 15 == 0] + "0x" + format(byte, "02x") for index, byte in enumerate(data)])
+        + " };\n"
+    ),
+    "hex": lambda data, name: data.hex(),
+    "num": lambda data, name: ", ".join([["", "\r\n"][index % 15 == 0 and index > 0] + "0x" + format(byte, "02x") for index, byte in enumerate(data)]) + "\r\n",
+    "perl": lambda data, name: hexify(data, '"', '" .', "my $" + name + " = \n", '";'),
+    "powershell": lambda data, name: "[Byte[]] $" + name + " = " + "".join(
+        [["", ","][index > 0 and index % 10000 > 0] + ["", "\r\n$" + name + " += "][index > 0 and index % 10000 == 0] + "0x" + format(byte, "x") for index, byte in enumerate(data)]
+    ),
+    "python": lambda data, name: hexify(data, name + ' += b"', '"', name + ' =  b""\n', '"'),
+    "raw": lambda data, name: data,
+    "ruby": lambda data, name: hexify(data, '"', '" +', name + " = \n", '"')
+}
+
+local_formats.update({alias: local_formats[format_name] for alias, format_name in format_aliases.items()})
+
+resident_helper = """
+require 'json'
+msfvenom = ARGV.shift
+$:.unshift(File.join(File.dirname(msfvenom), 'lib'))
+require 'msfenv'
+require 'msf/base'
+@framework = Msf::Simple::Framework.create(
+  module_types: [Msf::MODULE_PAYLOAD, Msf::MODULE_ENCODER, Msf::MODULE_NOP],
+  'DisableDatabase' => true
+)
+replies = STDOUT.dup
+replies.sync = true
+replies.puts(JSON.generate('ready' => true))
+
+replies_lock = Mutex.new
+
+STDIN.each_line do |line|
+  request = JSON.parse(line)
+  stdout_reader, stdout_writer = IO.pipe
+  stderr_reader, stderr_writer = IO.pipe
+
+  pid = fork do
+    stdout_reader.close
+    stderr_reader.close
+    STDIN.reopen(File::NULL)
+    STDOUT.reopen(stdout_writer)
+    STDERR.reopen(stderr_writer)
+    Process.setrlimit(:AS, request['memory']) if request['memory'] > 0
+    Dir.chdir(request['directory'])
+    ARGV.replace(request['arguments'])
+    $0 = msfvenom
+    status = 0
+
+    begin
+      load msfvenom
+    rescue SystemExit => exception
+      status = exception.status
+    rescue Exception => exception
+      STDERR.puts("Error: #{exception.message}")
+      status = 1
+    end
+
+    STDOUT.flush
+    STDERR.flush
+    exit!(status)
+  end
+
+  stdout_writer.close
+  stderr_writer.close
+  replies_lock.synchronize { replies.puts(JSON.generate('id' => request['id'], 'pid' => pid)) }
+
+  Thread.new do
+    stdout, stderr = [stdout_reader, stderr_reader].map do |reader|
+      Thread.new do
+        output = ''
+
+        reader.each_line do |output_line|
+          output << output_line
+          next unless request['progress']
+          progress = JSON.generate('id' => request['id'], 'line' => output_line.dup.force_encoding('UTF-8').scrub.chomp)
+          replies_lock.synchronize { replies.puts(progress) }
+        end
+
+        reader.close
+        output.force_encoding('UTF-8').scrub.chomp
+      end
+    end.map(&:value)
+
+    _, status = Process.wait2(pid)
+    reply = JSON.generate('id' => request['id'], 'stdout' => stdout, 'stderr' => stderr, 'status' => status.exitstatus)
+    replies_lock.synchronize { replies.puts(reply) }
+  end
+end
+"""
+
+class ArtifactCache:
+
+    def __init__(self, fingerprint, capacity):
+        self.fingerprint = fingerprint
+        self.capacity = capacity
+        self.directory = cache_file("artifacts")
+        self.lock = Lock()
+        self.index = {"artifacts": {}, "hits": 0, "misses": 0, "bypasses": 0}
+        self.index.update(read_json(join(self.directory, "index.json")))
+
+    def bypass(self):
+
+        with self.lock:
+            self.index["bypasses"] += 1
+            self.save()
+
+    def fetch(self, key, output):
+
+        with self.lock:
+            artifact = self.index["artifacts"].get(key)
+
+            try:
+
+                if not artifact:
+                    raise OSError
+
+                copyfile(join(self.directory, key), output)
+                artifact["used"] = time()
+                self.index["hits"] += 1
+                return artifact["feedback"].replace("Saved as: " + artifact.get("output", output), "Saved as: " + output)
+            except OSError:
+
+                if not isfile(join(self.directory, key)):
+                    self.index["artifacts"].pop(key, None)
+
+                self.index["misses"] += 1
+                return None
+            finally:
+                self.save()
+
+    def key(self, menus):
+        return sha256(
+            dumps(
+                {
+                    "fingerprint": self.fingerprint,
+                    "options": {menu: sorted([option.name, option.value] for option in options.assigned_options()) for menu, options in menus.items()}
+                },
+                sort_keys = True
+            ).encode()
+        ).hexdigest()
+
+    def save(self):
+        write_json(join(self.directory, "index.json"), self.index)
+
+    def statistics(self):
+        return (
+            "Artifact cache: "
+            + str(self.index["hits"])
+            + " hits, "
+            + str(self.index["misses"])
+            + " misses, "
+            + str(self.index["bypasses"])
+            + " bypasses, "
+            + str(len(self.index["artifacts"]))
+            + " artifacts using "
+            + str(round(sum(artifact["size"] for artifact in self.index["artifacts"].values()) / 1048576, 1))
+            + " of "
+            + str(round(self.capacity / 1048576, 1))
+            + " MiB."
+        )
+
+    def store(self, key, output, feedback):
+
+        with self.lock:
+
+            if not self.fingerprint or getsize(output) > self.capacity:
+                return
+
+            try:
+                makedirs(self.directory, exist_ok = True)
+                copyfile(output, join(self.directory, key + ".tmp"))
+                replace(join(self.directory, key + ".tmp"), join(self.directory, key))
+            except OSError:
+                return
+
+            artifacts = self.index["artifacts"]
+            artifacts[key] = {"size": getsize(output), "used": time(), "feedback": feedback, "output": output}
+
+            for evicted in sorted(artifacts, key = lambda artifact: artifacts[artifact]["used"]):
+
+                if sum(artifact["size"] for artifact in artifacts.values()) <= self.capacity:
+                    break
+
+                artifacts.pop(evicted)
+
+                try:
+                    remove(join(self.directory, evicted))
+                except OSError:
+                    pass
+
+            self.save()
+
+class AsyncSnakeskin:
+
+    def __init__(self, backend = "auto", refresh = False, artifact_cache_size = 256, fresh = False, timeout = 0, jobs = None):
+        self.session = Snakeskin(backend, refresh, artifact_cache_size, fresh, timeout)
+        self.executor = ThreadPoolExecutor(max_workers = jobs or cpu_count() or 1)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exception):
+        self.close()
+
+    async def call(self, function, *arguments):
+        return await get_running_loop().run_in_executor(self.executor, partial(function, *arguments))
+
+    def cached_listing(self, name):
+        return self.session.cached_listing(name)
+
+    async def cached_payload_options(self, payload):
+        return await self.call(self.session.cached_payload_options, payload)
+
+    def close(self):
+        self.executor.shutdown(wait = False, cancel_futures = True)
+
+    def command(self, menus, output):
+        return self.session.command(menus, output)
+
+    async def configure(self, generic = None, options = None):
+        return await self.call(self.session.configure, generic, options)
+
+    async def fan_out(self, menus, output, formats, progress = None, timeout = None):
+        cancel = Event()
+
+        try:
+            return await self.call(self.session.fan_out, menus, output, formats, progress, timeout, cancel)
+        except CancelledError:
+            cancel.set()
+            raise
+
+    async def generate(self, menus, output, progress = None, timeout = None):
+        cancel = Event()
+
+        try:
+            return await self.call(self.session.generate, menus, output, progress, timeout, cancel)
+        except CancelledError:
+            cancel.set()
+            raise
+
+    async def help(self):
+        return await self.call(self.session.help)
+
+    async def listing(self, name):
+        return await self.call(self.session.listing, name)
+
+    async def menus(self):
+        return await self.call(self.session.menus)
+
+    async def payload_options(self, payload):
+        return await self.call(self.session.payload_options, payload)
+
+    def reset_search(self, name):
+        self.session.reset_search(name)
+
+    async def search(self, name, query):
+        return await self.call(self.session.search, name, query)
+
+    def statistics(self):
+        return self.session.statistics()
+
+    async def validate(self, menus):
+        return await self.call(self.session.validate, menus)
+
+class SubprocessBackend:
+
+    def fingerprint(self):
+        return fingerprint()
+
+    def generate(self, arguments, progress = None, timeout = None, cancel = None):
+
+        with tracer.span(round_trip(arguments), "msfvenom", arguments = arguments) as span:
+            result = runner.run(arguments, progress, timeout, cancel)
+            span["status"] = result["status"]
+
+        return {"feedback": result["stderr"], "stdout": result["stdout"], "status": result["status"], "returncode": result["returncode"]}
+
+    def run(self, arguments):
+        return collect_output(self.stream(arguments))
+
+    def stream(self, arguments):
+
+        with tracer.span(round_trip(arguments), "msfvenom", arguments = arguments) as span:
+            resumed = perf_counter()
+
+            for line in runner.stream(arguments):
+                span["waiting"] = span.get("waiting", 0) + perf_counter() - resumed
+                span.setdefault("first_output", span["waiting"])
+                yield line
+                resumed = perf_counter()
+
+class FakeBackend(SubprocessBackend):
+
+    def __init__(self, number_of_payloads = 40):
+        self.number_of_payloads = number_of_payloads
+
+    def fingerprint(self):
+        return "fake-" + str(self.number_of_payloads)
+
+    def generate(self, arguments, progress = None, timeout = None, cancel = None):
+        lines = []
+
+        with tracer.span(round_trip(arguments), "msfvenom", arguments = arguments):
+            stdout, stderr = self.output(arguments)
+            relay_lines(stderr.split("\n"), lines, progress)
+
+        return {"feedback": "\n".join(lines), "stdout": stdout, "status": "completed", "returncode": 0}
+
+    def listing(self, title, names, descriptions = None):
+        width = max([len(name) for name in names] + [4]) + 2
+        heading = "Framework " + title
+        rows = ["    " + (name.ljust(width) + descriptions[index] if descriptions else name) for index, name in enumerate(names)]
+        columns = ["Name", "----"] if not descriptions else ["Name".ljust(width) + "Description", "----".ljust(width) + "-----------"]
+        return "\n".join(["", heading, "=" * len(heading), ""] + ["    " + column for column in columns] + rows + [""])
+
+    def output(self, arguments):
+
+        if arguments == ["--help"]:
+            return "\n".join(
+                [
+                    "MsfVenom - a Metasploit standalone payload generator.",
+                    "Also a replacement for msfpayload and msfencode.",
+                    "Usage: msfvenom [options] <var=val>",
+                    "Example: msfvenom -p windows/meterpreter/reverse_tcp LHOST=<IP> -f exe -o payload.exe",
+                    "",
+                    "Options:"
+                ]
+                + [
+                    "    " + flag.ljust(4) + "--" + name.ljust(16) + value.ljust(11) + description
+                    for flag, name, value, description
+                    in [
+                        ["-l, ", "list", "<type>", "List all modules for [type]. Types are: payloads, encoders, nops, platforms, archs, encrypt, formats, all"],
+                        ["-p, ", "payload", "<payload>", "Payload to use (--list payloads to get a list of payloads) or - for custom"],
+                        ["", "list-options", "", "List --payload <value>'s standard, advanced and evasion options"],
+                        ["-f, ", "format", "<format>", "Output format (use --list formats to get a list)"],
+                        ["-e, ", "encoder", "<encoder>", "The encoder to use (use --list encoders to get a list)"],
+                        ["", "encrypt", "<value>", "The type of encryption or encoding to apply to the shellcode (use --list encrypt to get a list)"],
+                        ["", "encrypt-key", "<value>", "A key to be used for --encrypt"],
+                        ["", "encrypt-iv", "<value>", "An initialization vector for --encrypt"],
+                        ["-a, ", "arch", "<arch>", "The architecture to use for --payload and --encoders (use --list archs to get a list)"],
+                        ["", "platform", "<platform>", "The platform for --payload (use --list platforms to get a list)"],
+                        ["-o, ", "out", "<path>", "Save the payload to a file"],
+                        ["-b, ", "bad-chars", "<list>", "Characters to avoid example: '\\x00\\xff'"],
+                        ["-n, ", "nopsled", "<length>", "Prepend a nopsled of [length] size on to the payload"],
+                        ["-s, ", "space", "<length>", "The maximum size of the resulting payload"],
+                        ["-i, ", "iterations", "<count>", "The number of times to encode the payload"],
+                        ["-v, ", "var-name", "<value>", "Specify a custom variable name to use for certain output formats"],
+                        ["-t, ", "timeout", "<second>", "The number of seconds to wait when reading the payload from STDIN (default 30, 0 to disable)"],
+                        ["-h, ", "help", "", "Show this message"]
+                    ]
+                ]
+            ), ""
+
+        if arguments[:1] == ["--list"]:
+            payloads = self.payloads()
+
+            return {
+                "archs": lambda: self.listing("Architectures [--arch <value>]", ["aarch64", "armbe", "armle", "mipsbe", "mipsle", "ppc", "x64", "x86"]),
+                "encoders": lambda: self.listing(
+                    "Encoders [--encoder <value>]",
+                    ["cmd/brace", "cmd/echo", "x64/xor", "x64/zutto_dekiru", "x86/countdown", "x86/shikata_ga_nai"],
+                    ["low       Bash Brace Expansion Command Encoder", "good      Echo Command Encoder", "normal    XOR Encoder",
+                     "manual    Zutto Dekiru", "normal    Single-byte XOR Countdown Encoder", "excellent Polymorphic XOR Additive Feedback Encoder"]
+                ),
+                "encrypts": lambda: self.listing("Encryption Formats [--encrypt <value>]", ["aes256", "base64", "rc4", "xor"]),
+                "formats": lambda: (
+                    self.listing("Executable Formats [--format <value>]", ["dll", "elf", "exe", "macho", "msi", "raw"]) + "\n"
+                    + self.listing("Transform Formats [--format <value>]", ["base64", "c", "csharp", "hex", "powershell", "python", "raw"])
+                ),
+                "payloads": lambda: self.listing(
+                    "Payloads (" + str(len(payloads)) + " total) [--payload <value>]",
+                    payloads,
+                    ["Fake " + payload.replace("/", " ") + " payload" for payload in payloads]
+                ),
+                "platforms": lambda: self.listing("Platforms [--platform <value>]", ["aix", "android", "bsd", "linux", "osx", "php", "python", "solaris", "windows"])
+            }[arguments[1]](), ""
+
+        if "--list-options" in arguments:
+            payload = arguments[arguments.index("-p") + 1]
+            segments = payload.split("/")
+            rule = "=" * (len(payload) + 28)
+
+            return "\n".join(
+                [
+                    "Options for payload/" + payload + ":",
+                    rule,
+                    "",
+                    "",
+                    "       Name: Fake " + " ".join(segments),
+                    "     Module: payload/" + payload,
+                    "   Platform: " + ["All", segments[0].title()][segments[0] != "generic"],
+                    "       Arch: " + [segments[1], "All"][len(segments) < 4],
+                    "Needs Admin: No",
+                    " Total size: " + str(200 + len(payload) * 4),
+                    "       Rank: Normal",
+                    "",
+                    "Provided by:",
+                    "    Snakeskin",
+                    "",
+                    "Basic options:",
+                    "Name      Current Setting  Required  Description",
+                    "----      ---------------  --------  -----------",
+                    "EXITFUNC  process          yes       Exit technique (Accepted: '', seh, thread, process, none)",
+                    "LHOST                      yes       The listen address (an interface may be specified)",
+                    "LPORT     4444             yes       The listen port",
+                    "ReverseListenerBindAddress no        The specific IP address to bind to on the local system",
+                    "",
+                    "Description:",
+                    "  Fake payload provided by the Snakeskin fake backend",
+                    "",
+                    "",
+                    "",
+                    "",
+                    "    Name                         Current Setting  Required  Description",
+                    "    ----                         ---------------  --------  -----------",
+                    "    AutoLoadStdapi               true             yes       Automatically load the Stdapi extension",
+                    "    MeterpreterDebugLogging                       no        The Meterpreter debug logging configuration, see",
+                    "                                                            https://github.com/rapid7/metasploit-framework/wiki/Meterpreter-Debugging",
+                    "    PayloadUUIDTracking          false            yes       Whether or not to automatically register generated UUIDs",
+                    "    PrependMigrate               false            yes       Spawns and runs shellcode in new process",
+                    "    PrependMigrateProc                            no        Process to spawn and run shellcode in",
+                    "    SessionRetryTotal            3600             no        Number of seconds try reconnecting for on network failure",
+                    "    VERBOSE                      false            no        Enable detailed status messages",
+                    "",
+                    "",
+                    "    Name  Current Setting  Required  Description",
+                    "    ----  ---------------  --------  -----------",
+                    ""
+                ]
+            ), "\n".join(["Advanced options for payload/" + payload + ":", rule, "Evasion options for payload/" + payload + ":", rule, ""])
+
+        payload = sha256(" ".join(arguments).encode()).digest() * 16
+
+        if "-o" in arguments:
+
+            try:
+
+                with open(arguments[arguments.index("-o") + 1], "wb") as artifact:
+                    artifact.write(payload)
+
+            except OSError as error:
+                return "", "Error: " + str(error)
+
+        return "", "No encoder specified, outputting raw payload\nPayload size: " + str(len(payload)) + " bytes\n" + (
+            "Saved as: " + arguments[arguments.index("-o") + 1] if "-o" in arguments else ""
+        )
+
+    def payloads(self):
+        platforms = ["aix", "android", "bsd", "linux", "osx", "php", "python", "solaris", "windows"]
+        architectures = ["aarch64", "armle", "mipsbe", "mipsle", "ppc", "x64", "x86"]
+        stages = ["custom", "dllinject", "exec", "meterpreter", "shell", "vncinject"]
+        stagers = ["bind_ipv6_tcp", "bind_tcp", "reverse_http", "reverse_https", "reverse_named_pipe", "reverse_tcp", "reverse_tcp_rc4", "reverse_tcp_uuid"]
+        combinations = len(platforms) * len(architectures) * len(stages) * len(stagers)
+        payloads = ["generic/custom", "generic/shell_bind_tcp", "generic/shell_reverse_tcp", "linux/x86/shell_reverse_tcp", "windows/x64/meterpreter/reverse_tcp"]
+
+        for index in range(self.number_of_payloads):
+            combination = index * 7919 % combinations
+
+            payloads.append(
+                "/".join(
+                    [
+                        platforms[combination % len(platforms)],
+                        architectures[combination // len(platforms) % len(architectures)],
+                        stages[combination // (len(platforms) * len(architectures)) % len(stages)],
+                        stagers[combination // (len(platforms) * len(architectures) * len(stages))]
+                    ]
+                )
+                + ["", "_" + str(index // combinations)][index >= combinations]
+            )
+
+        return sorted(set(payloads))
+
+    def stream(self, arguments):
+
+        with tracer.span(round_trip(arguments), "msfvenom", arguments = arguments):
+            stdout, stderr = self.output(arguments)
+            yield from (stdout or stderr).split("\n")
+
+class Menu:
+    __slots__ = ["name", "options", "indexes", "missing", "assigned", "version"]
+
+    def __init__(self, name, rows = ()):
+        self.name = name
+        self.options = [Option(*row) for row in rows]
+        self.indexes = {option.name: index for index, option in enumerate(self.options)}
+        self.missing = {option.name for option in self.options if option.required and not option.value}
+        self.assigned = {option.name for option in self.options if option.value}
+        self.version = 0
+
+    def __contains__(self, name):
+        return name in self.indexes
+
+    def __getitem__(self, index):
+        return self.options[index]
+
+    def __iter__(self):
+        return iter(self.options)
+
+    def __len__(self):
+        return len(self.options)
+
+    def assigned_options(self):
+        return [self.options[index] for index in sorted(self.indexes[name] for name in self.assigned)]
+
+    def clear(self):
+
+        for name in list(self.assigned):
+            self.set(name, "")
+
+    def get(self, name):
+        return self.options[self.indexes[name]]
+
+    def rows(self):
+        return [[option.name, option.value, option.required, option.description] for option in self.options]
+
+    def set(self, name, value):
+        option = self.options[self.indexes[name]]
+        option.value = value
+        self.version += 1
+
+        if value:
+            self.assigned.add(name)
+            self.missing.discard(name)
+        else:
+            self.assigned.discard(name)
+
+            if option.required:
+                self.missing.add(name)
+
+    def unsatisfied(self):
+        return sorted(self.missing, key = self.indexes.get)
+
+class MenuRenderer:
+
+    def __init__(self, stream, redraw):
+        self.stream = stream
+        self.redraw = redraw and stream.isatty()
+        self.pages = {}
+        self.previous = []
+        self.height = 0
+
+        if self.redraw:
+            register(self.close)
+
+    def close(self):
+        self.stream.write("\x1b[r\x1b[" + str(self.height) + ";1H\n")
+        self.stream.flush()
+
+    def display_menu(self, options, page, header, footer, search):
+
+        with tracer.span("display_menu", "render", header = header + "enu", page = page):
+            border = "-" * 119
+            frame = [border, "Snakeskin v" + __version__ + " - " + header + "enu", border] + self.page(options, page)
+
+            if search:
+                frame += [border, search]
+
+            frame += [border, footer, border]
+            height = get_terminal_size().lines
+
+            if not self.redraw or len(frame) + 4 > height:
+                self.stream.write("\n" + "\n".join(frame) + "\n")
+            elif len(frame) != len(self.previous) or height != self.height:
+                self.stream.write("\x1b[r\x1b[H\x1b[2J" + "\n".join(frame) + "\x1b[" + str(len(frame) + 1) + ";" + str(height) + "r\x1b[" + str(len(frame) + 1) + ";1H")
+            else:
+
+                self.stream.write(
+                    "\x1b7"
+                    + "".join(["\x1b[" + str(row + 1) + ";1H" + line + "\x1b[K" for row, line in enumerate(frame) if line != self.previous[row]])
+                    + "\x1b8"
+                )
+
+            self.stream.flush()
+            self.previous = frame
+            self.height = height
+
+    def page(self, options, page):
+        number_of_options = len(options)
+        signature = options.version if type(options) is Menu else number_of_options
+        cached = self.pages.get((id(options), page))
+
+        if cached and cached[0] is options and cached[1] == signature:
+            return cached[2]
+
+        lines = []
+
+        for scope in [range(group, min(group + 3, number_of_options)) for group in range((page - 1) * 30, min(page * 30, number_of_options), 3)]:
+
+            if type(options) is Menu:
+
+                lines.append(
+                    " ".join(
+                        [
+                            "[" + str(index_number + 1).rjust(3) + "] " + ellipsis(["", "*"][options[index_number].required] + options[index_number].name)
+                            for index_number
+                            in scope
+                        ]
+                    )
+                )
+
+                lines.append(" ".join([" " * 6 + ellipsis(options[index_number].value) for index_number in scope]))
+
+            else:
+                lines.append(" ".join(["[" + str(index_number + 1).rjust(3) + "] " + ellipsis(options[index_number]) for index_number in scope]))
+
+        if not number_of_options:
+            lines.append("No options available.")
+
+        if self.redraw:
+            lines += [""] * ([10, 20][type(options) is Menu and bool(number_of_options)] - len(lines))
+
+        if len(self.pages) > 256:
+            self.pages = {}
+
+        self.pages[(id(options), page)] = (options, signature, lines)
+        return lines
+
+class Option:
+    __slots__ = ["name", "value", "required", "description"]
+
+    def __init__(self, name, value, required, description):
+        self.name = name
+        self.value = value
+        self.required = required
+        self.description = description
+
+class ProcessRunner:
+
+    def __init__(self, processes = None, memory = 0, timeout = 0):
+        self.configure(processes, memory, timeout)
+
+    def configure(self, processes = None, memory = 0, timeout = 0):
+        self.processes = processes or cpu_count() or 1
+        self.slots = BoundedSemaphore(self.processes)
+        self.memory = memory
+        self.timeout = timeout
+
+    def limit(self, process):
+
+        if self.memory and prlimit:
+
+            try:
+                prlimit(process.pid, RLIMIT_AS, (self.memory * 1048576, self.memory * 1048576))
+            except OSError:
+                pass
+
+    def run(self, arguments, progress = None, timeout = None, cancel = None):
+        stdout_lines = []
+        stderr_lines = []
+
+        try:
+
+            with self.start(arguments) as process:
+                readers = [run_in_background(relay_lines, process.stdout, stdout_lines, progress), run_in_background(relay_lines, process.stderr, stderr_lines, progress)]
+                status = await_completion(process.wait, timeout, cancel)
+
+                if status != "completed":
+                    stop_process_group(process)
+
+                for reader in readers:
+                    reader.result()
+
+                returncode = process.returncode
+
+        except OSError as error:
+            stderr_lines.append("Error: " + str(error))
+            status = "completed"
+            returncode = 127
+
+        return {"stdout": "\n".join(stdout_lines), "stderr": "\n".join(stderr_lines), "status": status, "returncode": returncode}
+
+    @contextmanager
+    def start(self, arguments):
+
+        with self.slots:
+
+            with Popen(
+                [which("msfvenom") or "msfvenom"] + arguments,
+                stdin = DEVNULL,
+                stdout = PIPE,
+                stderr = PIPE,
+                text = True,
+                errors = "replace",
+                start_new_session = True
+            ) as process:
+                self.limit(process)
+
+                try:
+                    yield process
+                finally:
+
+                    if process.poll() is None:
+                        stop_process_group(process)
+
+    def stream(self, arguments, timeout = None):
+        stderr_lines = []
+        expired = Event()
+        produced = False
+        returncode = 0
+
+        try:
+
+            with self.start(arguments) as process:
+                reader = run_in_background(relay_lines, process.stderr, stderr_lines, None)
+                timer = Timer(timeout or self.timeout, lambda: expired.set() or stop_process_group(process))
+
+                if timeout or self.timeout:
+                    timer.start()
+
+                try:
+
+                    for line in process.stdout:
+                        produced = True
+                        yield line.rstrip("\n")
+
+                    returncode = process.wait()
+                    reader.result()
+                finally:
+                    timer.cancel()
+
+        except OSError as error:
+            stderr_lines.append("Error: " + str(error))
+
+        if expired.is_set():
+            raise TimeoutError("MsfVenom did not finish " + round_trip(arguments) + " within " + str(timeout or self.timeout) + " seconds.")
+
+        if not produced:
+            yield from stderr_lines
+
+        if returncode:
+            raise CalledProcessError(returncode, " ".join(["msfvenom"] + arguments))
+
+class ResidentBackend(SubprocessBackend):
+
+    def __init__(self):
+        self.helper = None
+        self.started = False
+        self.lock = Lock()
+        self.replies = {}
+        self.requests = count()
+
+    def generate(self, arguments, progress = None, timeout = None, cancel = None):
+
+        with tracer.span(round_trip(arguments), "msfvenom", arguments = arguments, resident = True):
+
+            with runner.slots:
+                reply = self.submit(arguments, progress)
+
+                try:
+                    status = reply and await_completion(reply.result, timeout, cancel)
+                except OSError:
+                    reply = None
+
+                if reply and status != "completed" and not self.stop(reply):
+                    return {"feedback": "", "stdout": "", "status": status, "returncode": None}
+
+            if not reply:
+                return super().generate(arguments, progress, timeout, cancel)
+
+            return {"feedback": reply.result()["stderr"], "stdout": reply.result()["stdout"], "status": status, "returncode": reply.result()["status"]}
+
+    def read_replies(self):
+
+        try:
+            loads(self.helper.stdout.readline())["ready"]
+
+            for line in self.helper.stdout:
+                reply = loads(line)
+
+                with self.lock:
+
+                    if "pid" in reply:
+                        self.replies[reply["id"]].pid = reply["pid"]
+                        self.replies[reply["id"]].started.set()
+                    elif "line" in reply:
+                        self.replies[reply["id"]].progress(reply["line"])
+                    else:
+                        self.replies.pop(reply["id"]).set_result(reply)
+
+        except (OSError, ValueError, KeyError):
+            pass
+
+        with self.lock:
+            self.helper.kill()
+            self.helper = None
+
+            for reply in self.replies.values():
+                reply.set_exception(OSError("The resident MsfVenom helper exited."))
+                reply.started.set()
+
+            self.replies = {}
+
+    def run(self, arguments):
+
+        with tracer.span(round_trip(arguments), "msfvenom", arguments = arguments, resident = True):
+
+            with runner.slots:
+                reply = self.submit(arguments)
+
+                if reply:
+
+                    try:
+                        result = reply.result(runner.timeout or None)
+                    except TimeoutError:
+                        self.stop(reply)
+                        raise TimeoutError("MsfVenom did not finish " + round_trip(arguments) + " within " + str(runner.timeout) + " seconds.")
+                    except OSError:
+                        pass
+                    else:
+
+                        if result["status"] != 0:
+                            raise CalledProcessError(result["status"], " ".join(["msfvenom"] + arguments), result["stdout"] or result["stderr"], result["stderr"])
+
+                        return result["stdout"] or result["stderr"]
+
+        return collect_output(super().stream(arguments))
+
+    def start(self):
+        binary, framework = framework_directory()
+        ruby = join(dirname(dirname(binary)), "embedded", "bin", "ruby")
+        self.started = True
+
+        try:
+            self.helper = Popen(
+                [ruby if isfile(ruby) else which("ruby") or "ruby", "-e", resident_helper, join(framework, "msfvenom")],
+                stdin = PIPE,
+                stdout = PIPE,
+                stderr = DEVNULL,
+                cwd = framework,
+                text = True,
+                start_new_session = True
+            )
+
+            run_in_background(self.read_replies)
+        except OSError:
+            pass
+
+    def stop(self, reply):
+        reply.started.wait()
+
+        try:
+            kill(reply.pid, SIGTERM)
+            reply.result(5)
+        except (AttributeError, OSError, TimeoutError):
+            return False
+
+        return True
+
+    def stream(self, arguments):
+        yield from self.run(arguments).split("\n")
+
+    def submit(self, arguments, progress = None):
+
+        with self.lock:
+
+            if not self.started:
+                self.start()
+
+            if not self.helper:
+                return None
+
+            identifier = next(self.requests)
+            reply = self.replies[identifier] = Future()
+            reply.progress = progress
+            reply.started = Event()
+
+            try:
+                self.helper.stdin.write(dumps({"id": identifier, "arguments": arguments, "directory": getcwd(), "memory": runner.memory * 1048576, "progress": bool(progress)}) + "\n")
+                self.helper.stdin.flush()
+            except OSError:
+                self.replies.pop(identifier)
+                return None
+
+            return reply
+
+    @staticmethod
+    def available():
+        binary, framework = framework_directory()
+        return bool(binary) and isfile(join(framework, "lib", "msfenv.rb")) and isfile(join(framework, "msfvenom"))
+
+class SchemaCache:
+
+    def __init__(self, fingerprint, refresh, capacity = 64, disk_capacity = 4096):
+        self.fingerprint = fingerprint
+        self.refresh = refresh
+        self.capacity = capacity
+        self.disk_capacity = disk_capacity
+        self.memory = OrderedDict()
+        self.disk = None
+        self.lock = Lock()
+
+    def get(self, payload):
+
+        with self.lock:
+
+            if payload in self.memory:
+                self.memory.move_to_end(payload)
+                return self.memory[payload]
+
+            schema = self.stored().get(payload)
+
+            if schema is not None:
+                self.stored()[payload] = self.stored().pop(payload)
+                self.remember(payload, schema)
+
+            return schema
+
+    def missing(self, payloads):
+
+        with self.lock:
+            return [payload for payload in payloads if payload not in self.stored()]
+
+    def put(self, schemas):
+
+        with self.lock:
+
+            for payload, schema in schemas.items():
+                self.remember(payload, schema)
+                self.stored().pop(payload, None)
+                self.stored()[payload] = schema
+
+            while len(self.stored()) > self.disk_capacity:
+                self.stored().pop(next(iter(self.stored())))
+
+            if self.fingerprint:
+                write_json(cache_file("schemas.json"), {"fingerprint": self.fingerprint, "schemas": self.stored()})
+
+    def remember(self, payload, schema):
+        self.memory[payload] = schema
+        self.memory.move_to_end(payload)
+
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last = False)
+
+    def stored(self):
+
+        if self.disk is None:
+            self.disk = {}
+            stored = read_json(cache_file("schemas.json"))
+
+            if not self.refresh and stored.get("fingerprint") == self.fingerprint:
+                self.disk = stored["schemas"]
+
+        return self.disk
+
+class SearchIndex:
+
+    def __init__(self, options):
+        self.options = options
+        self.names = [option.lower() for option in options]
+        self.trigrams = {}
+        self.segments = {}
+
+        for index, name in enumerate(self.names):
+
+            for position in range(len(name) - 2):
+                self.trigrams.setdefault(name[position:position + 3], set()).add(index)
+
+            for segment in split("[/_.-]", name):
+                self.segments.setdefault(segment, set()).add(index)
+
+        self.reset()
+
+    def candidates(self, term, pool):
+
+        if len(term) < 3:
+            return {index for index in pool if term in self.names[index]}
+
+        trigrams = [self.trigrams.get(term[position:position + 3], set()) for position in range(len(term) - 2)]
+        return {index for index in set.intersection(*trigrams) if index in pool and term in self.names[index]}
+
+    def fuzzy(self, terms):
+        scores = {}
+
+        for index, name in enumerate(self.names):
+            score = 0
+
+            for term in terms:
+                position = -1
+                start = None
+
+                for character in term:
+                    position = name.find(character, position + 1)
+
+                    if position < 0:
+                        break
+
+                    start = position if start is None else start
+
+                if position < 0:
+                    break
+
+                score += position - start + 1 - len(term) + [1, 0][start == 0 or name[start - 1] in "/_.-"]
+
+            else:
+                scores[index] = score
+
+        return sorted(scores, key = lambda index: (scores[index], index))[:30]
+
+    def rank(self, index, terms):
+        segments = split("[/_.-]", self.names[index])
+        return -sum([1, 2, 3][any(segment.startswith(term) for segment in segments) + (term in segments)] for term in terms)
+
+    def reset(self):
+        self.terms = []
+        self.matches = range(len(self.options))
+
+    def search(self, query):
+        terms = query.lower().split()
+
+        if not terms:
+            self.reset()
+            return self.options, False
+
+        pool = self.matches if all(any(previous in term for term in terms) for previous in self.terms) else range(len(self.options))
+
+        for term in sorted(terms, key = len, reverse = True):
+            pool = self.candidates(term, pool)
+
+        if pool:
+            self.terms = terms
+            self.matches = pool
+            return [self.options[index] for index in sorted(pool, key = lambda index: (self.rank(index, terms), index))], False
+
+        return [self.options[index] for index in self.fuzzy(terms)], True
+
+class Snakeskin:
+
+    def __init__(self, backend = "auto", refresh = False, artifact_cache_size = 256, fresh = False, timeout = 0):
+        self.backend = backends[backend]()
+        self.cache = load_cache(refresh, self.backend)
+        self.schemas = SchemaCache(self.cache["fingerprint"], refresh)
+        self.artifacts = ArtifactCache(self.cache["fingerprint"], artifact_cache_size * 1048576)
+        self.fingerprint = self.cache["fingerprint"]
+        self.fresh = fresh
+        self.timeout = timeout
+        self.indexes = {}
+        self.lock = Lock()
+        self.queries = {}
+
+    def cached_listing(self, name):
+
+        with cache_lock:
+            return self.cache["listings"].get(name)
+
+    def cached_payload_options(self, payload):
+        return self.schemas.get(payload)
+
+    def command(self, menus, output):
+        return ["msfvenom"] + build_command(menus, output)
+
+    def configure(self, generic = None, options = None):
+        return configure_menus(generic or {}, options or {}, self)
+
+    def fan_out(self, menus, output, formats, progress = None, timeout = None, cancel = None):
+        return fan_out(menus, output, formats, self.backend, self.artifacts, self.fresh, progress, timeout or self.timeout, cancel)
+
+    def generate(self, menus, output, progress = None, timeout = None, cancel = None):
+        return generate(menus, output, self.backend, self.artifacts, self.fresh, progress, timeout or self.timeout, cancel)
+
+    def help(self):
+        return self.query("help", get_help, self.cache, self.backend)
+
+    def listing(self, name, listing = None):
+        return self.query("listing " + name, get_listing, name, self.cache, self.backend, listing)
+
+    def menus(self):
+        self.help()
+        return new_menus(self.cache)
+
+    def payload_options(self, payload, schema = None, header_ready = None):
+
+        try:
+            options = self.query("payload " + payload, get_payload_options, payload, self.schemas, self.backend, schema, header_ready)
+        finally:
+
+            if header_ready:
+                header_ready.set()
+
+        if schema is not None and schema is not options:
+            schema.update(options)
+
+        return options
+
+    def prefetch(self, names = listing_parsers):
+        prefetches = {}
+
+        for name in names:
+
+            if name not in self.cache["listings"]:
+                listing = []
+                prefetches[name] = (run_in_background(self.listing, name, listing), listing)
+
+        return prefetches
+
+    def query(self, key, function, *arguments):
+
+        with self.lock:
+            owner = key not in self.queries
+
+            if owner:
+                self.queries[key] = Future()
+
+            pending = self.queries[key]
+
+        if owner:
+
+            try:
+                pending.set_result(function(*arguments))
+            except Exception as exception:
+                pending.set_exception(exception)
+
+            with self.lock:
+                self.queries.pop(key)
+
+        return pending.result()
+
+    def reset_search(self, name):
+
+        with self.lock:
+
+            if name in self.indexes:
+                self.indexes[name].reset()
+
+    def search(self, name, query):
+        listing = self.listing(name)
+
+        with self.lock:
+
+            if name not in self.indexes:
+
+                with tracer.span("search index", "search", options = len(listing)):
+                    self.indexes[name] = SearchIndex(listing)
+
+            with tracer.span("search query", "search", query = query):
+                return self.indexes[name].search(" ".join(query.lower().split()))
+
+    def statistics(self):
+        return self.artifacts.statistics()
+
+    def validate(self, menus):
+        payload = menus["generic"].get("payload").value
+        return missing_options(menus) + preflight(menus, self.cache, payload and self.schemas.get(payload))
+
+class TableParser:
+
+    def __init__(self):
+        self.columns = []
+        self.headers = []
+        self.previous = ""
+        self.record = None
+
+    def cells(self, line):
+        boundaries = self.columns[:1]
+
+        for column in self.columns[1:]:
+
+            if column < len(line) and line[column - 1] != " ":
+                overflow = search(" +", line[column:])
+                column = column + overflow.end() if overflow else len(line)
+
+            boundaries.append(max(column, boundaries[-1]))
+
+        return [line[start:end].strip() for start, end in zip(boundaries, boundaries[1:] + [None])]
+
+    def feed(self, line):
+        line = line.rstrip()
+        completed = None
+
+        if not self.columns:
+
+            if line.strip() and not line.replace("-", "").strip() and self.previous.strip():
+                self.columns = [dashes.start() for dashes in finditer("-+", line)]
+                self.headers = self.cells(self.previous)
+
+            self.previous = line
+
+        elif not line.strip():
+            completed = self.flush()
+            self.columns = []
+            self.previous = ""
+        elif self.record and len(self.columns) > 1 and not line[:self.columns[-1]].strip():
+            self.record[self.headers[-1]] = (self.record[self.headers[-1]] + " " + line.strip()).strip()
+        else:
+            completed = self.flush()
+            self.record = dict(zip(self.headers, self.cells(line)))
+
+        return completed
+
+    def flush(self):
+        record, self.record = self.record, None
+        return record
+
+class Tracer:
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.origin = perf_counter()
+        self.threads = {}
+
+    def export(self, path):
+        write_json(
+            path,
+            {
+                "traceEvents": [
+                    {"name": "thread_name", "ph": "M", "pid": getpid(), "tid": thread, "args": {"name": name}} for thread, name in self.threads.items()
+                ]
+                + self.events,
+                "displayTimeUnit": "ms"
+            }
+        )
+
+    def mark(self, name, category, started, **arguments):
+
+        if not self.enabled:
+            return
+
+        thread = current_thread()
+        self.threads[thread.ident] = thread.name
+
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((started - self.origin) * 1000000, 1),
+                "dur": round((perf_counter() - started) * 1000000, 1),
+                "pid": getpid(),
+                "tid": thread.ident,
+                "args": arguments
+            }
+        )
+
+    @contextmanager
+    def record(self, name, category, arguments):
+        started = perf_counter()
+
+        try:
+            yield arguments
+        finally:
+            self.mark(name, category, started, **arguments)
+
+    def report(self, profile, path):
+
+        if path:
+            self.export(path)
+            print("\nTrace written to '" + path + ".'")
+
+        if profile:
+            print("\n" + self.summary())
+
+    def span(self, name, category, **arguments):
+        return self.record(name, category, arguments) if self.enabled else nullcontext(arguments)
+
+    def summary(self):
+        children = {}
+        spans = {}
+
+        for thread in self.threads:
+            stack = []
+
+            for event in sorted([event for event in self.events if event["tid"] == thread], key = lambda event: (event["ts"], -event["dur"])):
+
+                while stack and stack[-1]["ts"] + stack[-1]["dur"] <= event["ts"]:
+                    stack.pop()
+
+                if stack:
+                    children.setdefault(id(stack[-1]), []).append(event)
+
+                stack.append(event)
+
+        def waiting(event):
+
+            if "waiting" in event["args"]:
+                return event["args"]["waiting"]
+
+            if event["cat"] == "msfvenom":
+                return event["dur"] / 1000000
+
+            return sum(waiting(child) for child in children.get(id(event), []))
+
+        for event in self.events:
+            span = spans.setdefault((event["cat"], event["name"]), {"count": 0, "total": 0, "longest": 0, "waiting": 0, "first": 0})
+            span["count"] += 1
+            span["total"] += event["dur"] / 1000000
+            span["longest"] = max(span["longest"], event["dur"] / 1000000)
+            span["waiting"] += waiting(event)
+            span["first"] += event["args"].get("first_output", 0)
+
+        lines = [
+            "Snakeskin profile: " + str(len(self.events)) + " spans over " + str(round(perf_counter() - self.origin, 3)) + " seconds.",
+            "",
+            "Category  " + "Span".ljust(34) + "Count".rjust(6) + "Total (s)".rjust(11) + "MsfVenom (s)".rjust(14) + "Snakeskin (s)".rjust(15)
+            + "Max (ms)".rjust(11) + "First output (s)".rjust(18),
+            "-" * 119
+        ]
+
+        for (category, name), span in sorted(spans.items(), key = lambda item: (item[0][0], -item[1]["total"])):
+
+            lines.append(
+                category.ljust(10)
+                + (name if len(name) <= 33 else name[:30] + "." * 3).ljust(34)
+                + str(span["count"]).rjust(6)
+                + str(round(span["total"], 3)).rjust(11)
+                + str(round(span["waiting"], 3)).rjust(14)
+                + str(round(span["total"] - span["waiting"], 3)).rjust(15)
+                + str(round(span["longest"] * 1000, 2)).rjust(11)
+                + (str(round(span["first"] / span["count"], 3)) if span["first"] else "").rjust(18)
+            )
+
+        return "\n".join(lines)
+
+backends = {
+    "auto": lambda: [SubprocessBackend, ResidentBackend][ResidentBackend.available()](),
+    "fake": FakeBackend,
+    "resident": ResidentBackend,
+    "subprocess": SubprocessBackend
+}
+
+cache_lock = Lock()
+history_lock = Lock()
+lowercase_listings = {}
+specific_menus = ["basic", "advanced", "evasion"]
+runner = ProcessRunner()
+tracer = Tracer()
+worker_backend = None
+
+def await_completion(wait, timeout, cancel):
+    deadline = perf_counter() + timeout if timeout else None
+
+    try:
+
+        while True:
+
+            try:
+                wait(0.1 if deadline is None else max(0, min(0.1, deadline - perf_counter())))
+                return "completed"
+            except (TimeoutError, TimeoutExpired):
+
+                if cancel and cancel.is_set():
+                    return "cancelled"
+
+                if deadline is not None and perf_counter() >= deadline:
+                    return "timed out"
+
+    except KeyboardInterrupt:
+
+        if cancel:
+            cancel.set()
+
+        return "cancelled"
+
+def build_command(menus, output):
+    generic_arguments = [
+        argument
+        for option
+        in menus["generic"].assigned_options()
+        for argument
+        in ["--" + option.name.replace("architecture", "arch"), option.value]
+    ]
+
+    specific_arguments = [option.name + "=" + option.value for menu in specific_menus for option in menus[menu].assigned_options()]
+
+    return generic_arguments + specific_arguments + ["-o", output]
+
+def cache_file(name):
+    return join(environ.get("XDG_CACHE_HOME") or expanduser("~/.cache"), "snakeskin", name)
+
+def check_option(menu, option, default):
+    label = menu.title() + " option " + option.name
+    accepted = search(r"\(Accepted: (.*?)\)", option.description)
+
+    if accepted and option.value not in [accepted_value.strip("'") for accepted_value in accepted.group(1).split(", ")]:
+        return label + " must be one of " + accepted.group(1) + "."
+
+    if option.name.endswith("PORT") and not (option.value.isdigit() and int(option.value) <= 65535):
+        return label + " must be a port number between 0 and 65535."
+
+    if default.lower() in ["true", "false"] and option.value.lower() not in ["y", "yes", "t", "1", "true", "n", "no", "f", "0", "false"]:
+        return label + " must be true or false."
+
+    if default.isdigit() and not option.name.endswith("PORT") and not fullmatch("-?[0-9]+|0x[0-9a-fA-F]+", option.value):
+        return label + " must be a whole number."
+
+    if option.name.endswith("HOST") and (
+        len(option.value.split()) != 1 or fullmatch("[0-9.]+", option.value) and not fullmatch(r"((25[0-5]|2[0-4][0-9]|1?[0-9]?[0-9])\.){3}(25[0-5]|2[0-4][0-9]|1?[0-9]?[0-9])", option.value)
+    ):
+        return label + " must be a single IP address, host name or interface."
+
+    return None
+
+def collect_output(lines):
+    collected = []
+
+    try:
+
+        for line in lines:
+            collected.append(line)
+
+    except CalledProcessError as error:
+        error.output = "\n".join(collected)
+        raise
+
+    return "\n".join(collected)
+
+def configure_menus(values, options, session):
+    menus = session.menus()
+    problems = []
+
+    for name, value in values.items():
+
+        if name in menus["generic"]:
+            menus["generic"].set(name, [str(value), str(value).lower()][type(value) is bool])
+        else:
+            problems.append("Unknown generic option " + name + ".")
+
+    payload = menus["generic"].get("payload").value
+
+    if payload and payload not in session.listing("payload"):
+        problems.append("Unknown payload " + payload + ".")
+    elif payload:
+        schema = session.payload_options(payload)
+
+        for menu in specific_menus:
+            menus[menu] = Menu(menu, schema[menu])
+
+        for name, value in options.items():
+            menu = next(filter(lambda menu: name in menus[menu], specific_menus), None)
+
+            if menu:
+                menus[menu].set(name, [str(value), str(value).lower()][type(value) is bool])
+            else:
+                problems.append("Unknown option " + name + " for payload " + payload + ".")
+
+    return menus, problems
+
+def data_file(name):
+    return join(environ.get("XDG_DATA_HOME") or expanduser("~/.local/share"), "snakeskin", name)
+
+def describe_result(result):
+
+    if result["status"] == "success":
+        return (
+            ["Payload successfully generated", "Payload formatted locally"][result.get("local", False)]
+            + " and saved to file '" + result["output"] + "' (" + str(result["size"]) + " bytes in " + str(result["seconds"]) + " seconds)."
+        )
+
+    if result["status"] in ["cancelled", "timed out"]:
+        return "Payload generation " + result["status"] + " after " + str(result["seconds"]) + " seconds."
+
+    if result["errors"]:
+        return (
+            "Payload generation failed after " + str(result["seconds"]) + " seconds. MsfVenom reported the following error"
+            + ["", "s"][bool(len(result["errors"]) - 1)]
+            + ":\n\n"
+            + "\n".join(result["errors"])
+        )
+
+    return "Payload generation failed after " + str(result["seconds"]) + " seconds. MsfVenom exited with status " + str(result["returncode"]) + " without saving the payload."
+
+def deterministic(menus):
+    values = {option.name: option.value for options in menus.values() for option in options.assigned_options()}
+
+    return not (
+        {"bad-chars", "encoder", "nopsled", "smallest"} & set(values)
+        or "encrypt" in values and not {"encrypt-key", "encrypt-iv"} <= set(values)
+        or "http" in values.get("payload", "") and "PayloadUUIDSeed" not in values
+    )
+
+@lru_cache(maxsize = 8192)
+def ellipsis(text):
+    return (text if len(text) <= 33 else text[:30] + "." * 3).ljust(33)
+
+def fan_out(menus, output, formats, backend, artifacts, fresh, progress = None, timeout = None, cancel = None):
+    primary = menus["generic"].get("format").value or "raw"
+    formats = list(dict.fromkeys(format_aliases.get(format_name, format_name) for format_name in [primary] + formats))
+    outputs = {formats[0]: output}
+
+    for format_name in formats[1:]:
+        extension = format_extensions.get(format_name, format_name)
+        path = splitext(output)[0] + "." + extension
+        number = 1
+
+        while path in outputs.values():
+            path = splitext(output)[0] + "-" + format_name + ["", str(number)][number > 1] + "." + extension
+            number += 1
+
+        outputs[format_name] = path
+
+    local = [format_name for format_name in formats if format_name in local_formats]
+    raw = outputs.get("raw", output + ".raw.tmp")
+    variable = "var-name" in menus["generic"] and menus["generic"].get("var-name").value or "buf"
+    cancel = cancel or Event()
+
+    def run_format(format_name, path):
+        variant = {menu: Menu(menu, options.rows()) for menu, options in menus.items()}
+        variant["generic"].set("format", format_name)
+        return generate(variant, path, backend, artifacts, fresh, progress and (lambda line: progress("[" + format_name + "] " + line)), timeout, cancel)
+
+    with ThreadPoolExecutor(max_workers = len(formats)) as executor:
+        futures = {format_name: executor.submit(run_format, format_name, outputs[format_name]) for format_name in formats if format_name not in local}
+
+        if local:
+            futures["raw"] = executor.submit(run_format, "raw", raw)
+
+        try:
+            wait(list(futures.values()))
+        except KeyboardInterrupt:
+            cancel.set()
+
+        results = {format_name: future.result() for format_name, future in futures.items()}
+
+    for format_name in local:
+
+        if format_name != "raw":
+            results[format_name] = dict(results["raw"], output = outputs[format_name], local = True)
+
+            if results["raw"]["status"] == "success":
+                started = perf_counter()
+
+                with open(raw, "rb") as payload:
+                    formatted = local_formats[format_name](payload.read(), variable)
+
+                with open(outputs[format_name], "wb") as formatted_output:
+                    formatted_output.write(formatted if type(formatted) is bytes else formatted.encode())
+
+                results[format_name].update({"command": "local " + format_name + " formatter", "cached": False, "size": getsize(outputs[format_name])})
+                results[format_name]["seconds"] = round(perf_counter() - started, 3)
+                record_generation(results[format_name])
+
+    if raw not in outputs.values() and isfile(raw):
+        remove(raw)
+
+    return [dict(results[format_name], format = format_name, local = results[format_name].get("local", False)) for format_name in formats]
+
+def fingerprint():
+    binary, framework = framework_directory()
+
+    if not binary:
+        return ""
+
+    digest = sha256((binary + str(getsize(binary)) + str(getmtime(binary))).encode())
+
+    for version_file in ["lib/metasploit/framework/version.rb", "lib/msf/core/version.rb"]:
+
+        if isfile(join(framework, version_file)):
+
+            with open(join(framework, version_file), "rb") as version:
+                digest.update(version.read())
+
+    for module_type in ["payloads", "encoders", "nops"]:
+
+        for directory, _, _ in walk(join(framework, "modules", module_type)):
+            digest.update((directory + str(getmtime(directory))).encode())
+
+    return digest.hexdigest()
+
+def framework_directory():
+    binary = which("msfvenom")
+
+    if not binary:
+        return "", ""
+
+    binary = realpath(binary)
+    frameworks = [dirname(binary), join(dirname(dirname(binary)), "embedded", "framework")]
+    return binary, next(filter(lambda directory: isdir(join(directory, "modules")), frameworks), frameworks[0])
+
+def generate(menus, output, backend, artifacts, fresh, progress = None, timeout = None, cancel = None):
+    arguments = build_command(menus, output)
+    result = {"command": " ".join(["msfvenom"] + [quote(argument) for argument in arguments]), "output": output, "cached": False, "started": round(time(), 3)}
+    started = perf_counter()
+    key = None
+
+    if fresh or not deterministic(menus):
+        artifacts.bypass()
+    else:
+        key = artifacts.key(menus)
+        feedback = artifacts.fetch(key, output)
+
+        if feedback is not None:
+            result.update({"feedback": feedback, "stdout": "", "status": "completed", "returncode": 0, "cached": True})
+            relay_lines(feedback.split("\n"), [], progress)
+
+    if not result["cached"]:
+        result.update(backend.generate(arguments, progress, timeout, cancel))
+
+    result["errors"] = generation_errors(result["feedback"])
+
+    if result["status"] == "completed":
+        result["status"] = ["success", "failed"][bool(result["errors"]) or bool(result["returncode"]) or not isfile(output)]
+
+    result["size"] = getsize(output) if result["status"] == "success" else 0
+    result["seconds"] = round(perf_counter() - started, 3)
+
+    if key and not result["cached"] and result["status"] == "success":
+        artifacts.store(key, output, result["feedback"])
+
+    record_generation(result)
+    return result
+
+def generation_errors(output):
+    return [line for line in output.split("\n") if "error:" in line.lower()]
+
+def get_help(cache, backend):
+
+    if not cache["help"]:
+
+        try:
+            output = backend.run(["--help"])
+        except CalledProcessError as error:
+            output = error.output
+
+        help_options = parse_help(output)
+
+        if not help_options:
+            return help_options
+
+        with cache_lock:
+            cache["help"] = help_options
+            save_cache(cache)
+
+    return cache["help"]
+
+def get_listing(name, cache, backend, listing = None):
+
+    if name not in cache["listings"]:
+        command, parser = listing_parsers[name]
+        listing = [] if listing is None else listing
+
+        try:
+
+            with tracer.span("parse listing " + name, "parse"):
+
+                for record in parser(backend.stream(["--list", command])):
+                    listing.append(record)
+
+        except CalledProcessError:
+            return listing
+
+        if not listing:
+            return listing
+
+        with cache_lock:
+            cache["listings"][name] = listing
+            save_cache(cache)
+
+    return cache["listings"][name]
+
+def get_payload_options(payload, schemas, backend, schema = None, header_ready = None):
+    cached = schemas.get(payload)
+
+    if cached is None:
+        cached = {} if schema is None else schema
+
+        try:
+
+            with tracer.span("parse options", "parse", payload = payload) as span:
+                parse_payload_options(backend.stream(["--list-options", "-p", payload]), cached, header_ready)
+                span.update({section: len(cached[section]) for section in specific_menus})
+
+        except CalledProcessError:
+            return cached
+        finally:
+
+            if header_ready:
+                header_ready.set()
+
+        if any(cached[section] for section in specific_menus):
+            schemas.put({payload: cached})
+
+    return cached
+
+def hexify(data, line_start, line_end, buffer_start, buffer_end, width = 60):
+    output = [buffer_start]
+    column = 0
+    new_line = True
 
-def display_menu(options, page, header, footer, search):
-    number_of_options = len(options)
-    border = "-" * 119
-    print("\n" + border + "\nSnakeskin v" + __version__ + " - " + header + "enu\n" + border)
+    for number, byte in enumerate(data, 1):
+        append = [line_start, ""][not new_line] + "\\x" + format(byte, "02x")
+        column += len(append)
+        new_line = column + len(line_end) >= width or column + len(buffer_end) >= width
 
-    if number_of_options:
+        if new_line:
+            column = 0
+            append += [line_end, buffer_end][number == len(data)] + "\n"
 
-        for scope in [range(group, min(group + 3, number_of_options)) for group in range((page - 1) * 30, min(page * 30, number_of_options), 3)]:
+        output.append(append)
 
-            if type(options[0]) is list:
+    if not new_line:
+        output.append(buffer_end + "\n")
 
-                print(
-                    " ".join(
-                        [
-                            "[" + str(index_number + 1).rjust(3) + "] " + ellipsis(["", "*"][options[index_number][2]] + options[index_number][0])
-                            for index_number
-                            in scope
-                        ]
-                    )
-                    + "\n"
-                    + " ".join([" " * 6 + ellipsis(options[index_number][1]) for index_number in scope])
-                )
+    return "".join(output)
 
-            else:
-                print(" ".join(["[" + str(index_number + 1).rjust(3) + "] " + ellipsis(options[index_number]) for index_number in scope]))
+def known_values(name, listing):
+    known = lowercase_listings.get(name)
 
-    else:
-        print("No options available.")
+    if not known or known[0] is not listing:
+        known = lowercase_listings[name] = (listing, {entry.lower() for entry in listing})
 
-    if search:
-        print(border + "\n" + search)
+    return known[1]
 
-    print(border + "\n" + footer + "\n" + border)
+def load_cache(refresh, backend):
+    cache = {"fingerprint": backend.fingerprint(), "help": [], "listings": {}}
+    stored = read_json(cache_file("listings.json"))
 
-def ellipsis(text):
-    return sorted([text, text[:30] + "." * 3], key = len)[0].ljust(33)
+    if not refresh and stored.get("fingerprint") == cache["fingerprint"]:
+        cache.update(stored)
+
+    return cache
 
 def main():
+    parser = ArgumentParser(description = "MsfVenom user interface wrapper")
+    parser.add_argument("--artifact-cache-size", type = int, default = 256, metavar = "MIB", help = "maximum size of the generated payload cache")
+    parser.add_argument("--batch", metavar = "SPECIFICATION", help = "generate every job in a JSON or TOML specification file, then exit")
+    parser.add_argument("--backend", choices = sorted(backends), default = "auto", help = "how to run MsfVenom (default: resident if available)")
+    parser.add_argument("--fresh", action = "store_true", help = "always generate payloads instead of copying identical cached ones")
+    parser.add_argument("--jobs", type = int, default = cpu_count() or 1, help = "number of MsfVenom workers used by --batch and --precompute")
+    parser.add_argument("--load", metavar = "PROFILE", help = "start from a saved profile instead of empty menus")
+    parser.add_argument("--max-processes", type = int, default = cpu_count() or 1, metavar = "N", help = "maximum number of MsfVenom processes running at once")
+    parser.add_argument("--memory-limit", type = int, default = 0, metavar = "MIB", help = "maximum address space of each MsfVenom process (default: unlimited)")
+    parser.add_argument("--no-splash", "--quiet", action = "store_true", help = "skip the splash screen and open the first menu as soon as MsfVenom answers")
+    parser.add_argument("--precompute", action = "store_true", help = "probe and cache the options of every payload, then exit")
+    parser.add_argument("--profile", action = "store_true", help = "print a summary of time spent in MsfVenom, parsing and rendering on exit")
+    parser.add_argument("--query-timeout", type = float, default = 0, metavar = "SECONDS", help = "give up on MsfVenom listings and option queries after this many seconds")
+    parser.add_argument("--redraw", action = "store_true", help = "repaint menus in place at the top of the terminal instead of scrolling")
+    parser.add_argument("--refresh-cache", action = "store_true", help = "discard cached MsfVenom listings and query MsfVenom again")
+    parser.add_argument("--trace", metavar = "FILE", help = "write timed spans to FILE as Chrome trace-event JSON on exit")
+    parser.add_argument("--timeout", type = float, default = 0, metavar = "SECONDS", help = "cancel payload generation after this many seconds (default: never)")
+    started = perf_counter()
+    arguments = parser.parse_args()
+
+    if arguments.profile or arguments.trace:
+        tracer.enabled = True
+        register(tracer.report, arguments.profile, arguments.trace)
+
+    runner.configure(max(1, arguments.max_processes), arguments.memory_limit, arguments.query_timeout)
+    session = Snakeskin(arguments.backend, arguments.refresh_cache, arguments.artifact_cache_size, arguments.fresh, arguments.timeout)
+    renderer = MenuRenderer(stdout, arguments.redraw)
+
+    if arguments.precompute:
+        precompute_schemas(session, arguments.backend, max(1, arguments.jobs))
+        return
+
+    if arguments.batch:
+        raise SystemExit(not run_batch(arguments.batch, session, max(1, arguments.jobs)))
+
+    help_prefetch = run_in_background(session.help)
+    prefetches = session.prefetch()
+
+    if not arguments.no_splash:
+
+        with tracer.span("splash", "startup"):
+            getpass(splash_screen())
+
+    with tracer.span("wait for help", "startup"):
 
-    splash = (
-        "\n                                    ===============\n"
-        "                                 =====================             ============\n"
-        "           =========           ===========   ==========          ===========\n"
-        "       =================      =========         ========       ==========\n"
-        "     =========   =========   ========            ========    ======\n"
-        "    ======           ======  ========            ========   ====\n"
-        "    =====             ======  ========           ========  ====\n"
-        "    =====             ======   ========         ========   ====\n"
-        "    ======            ======    =========      ========    ====\n"
-        "     ======          =======      ========     =======     =====\n"
-        "       ======        ======        =========   ======       ====\n"
-        "=        ======     =======          ========  =======     =====\n"
-        "==         =====    ======            =======   ===============\n"
-        " ==          ====   ======             =======    ===========\n"
-        " ==          ====   =======           ========\n"
-        "  ===       =====   ========         ========   Snakeskin v{version}\n"
-        "   ============       =========   ==========    MsfVenom User Interface Wrapper\n"
-        "       =====           ===================      {year} {author}\n"
-        "                          =============         {email}\n"
-        "\nPress the Enter key to continue..."
-    ).format(version = __version__, year = __year__, author = __author__, email = __email__)
+        try:
+            help_prefetch.result()
+        except TimeoutError as error:
+            raise SystemExit("\n" + str(error) + " Run Snakeskin again, with a longer --query-timeout if MsfVenom is slow to start.")
 
-    while "=" in splash:
-        splash = splash.replace("=", choice([character for character in "~!@#$%^&*()-+[]{};:,.<>?/" if character != splash[splash.index("=") - 1]]), 1)
+    menus = session.menus()
+    schema = None
+    drift = None
 
-    getpass(splash)
+    if arguments.load:
+        menus, schema, drift = restore_profile(arguments.load, session)
 
-    menus = {
-        "generic": [
-            [option[10:26].strip().replace("arch", "architecture"), "", "payload" in option[10:26], option[37:]]
-            for option
-            in getoutput("msfvenom --help").split("\n")[6:]
-            if option[10:26].strip() not in ["list", "list-options", "out", "timeout", "help"]
-        ],
-        "basic": [],
-        "advanced": [],
-        "evasion": []
-    }
-
-    specific_menus = [menu for menu in menus.keys() if menu != "generic"]
-
-    submenus = {
-        "architecture": "[architecture.strip() for architecture in getoutput('msfvenom --list archs').split('\\n')[6:-1]]",
-        "encoder": "[encoder.split()[0] for encoder in getoutput('msfvenom --list encoders').split('\\n')[6:-1]]",
-        "encrypt": "[encrypt.strip() for encrypt in getoutput('msfvenom --list encrypts').split('\\n')[6:-1]]",
-        "format": (
-            "sorted([format.strip() for format in getoutput('msfvenom --list formats').split('\\n') if format.strip().replace('-', '').replace('=', '') and "
-            "'Name' not in format and '[--format <value>]' not in format])"
-        ),
-        "payload": "[payload.split()[0] for payload in getoutput('msfvenom --list payloads').split('\\n')[6:-1] if 'generic/' not in payload]",
-        "platform": "[platform.strip() for platform in getoutput('msfvenom --list platforms').split('\\n')[6:-1]]"
-    }
+    submenus = {name: session.cached_listing(name) for name in listing_parsers}
 
     menu_current = "generic"
     menu_page = 1
     menu_selection = ""
 
     while menu_selection != "q":
+
+        if drift and drift.done():
+
+            if timed_out(drift):
+                print("\nCould not check the loaded profile against the installed MsfVenom. " + str(drift.exception()))
+            elif drift.result():
+                print("\nWarning: the installed MsfVenom disagrees with the loaded profile.\n\n" + "\n".join(drift.result()))
+
+            drift = None
+
         menu_options = menus[menu_current]
         menu_number_of_options = len(menu_options)
         menu_number_of_pages = max(1, int(ceil(menu_number_of_options / 30)))
+        menu_pending = pending_listings(prefetches)
 
-        display_menu(
+        renderer.display_menu(
             menu_options,
             menu_page,
             menu_current.title() + " Options M",
-            "Page: [N]ext, [P]revious | Menu: [G]eneric, [B]asic, [A]dvanced, [E]vasion | Miscellaneous: e[X]ecute, [Q]uit.",
-            ""
+            "Page: [N]ext, [P]revious | Menu: [G]eneric, [B]asic, [A]dvanced, [E]vasion | Other: [S]ave, [L]oad, e[X]ecute, [Q]uit.",
+            ["", "Getting " + ", ".join(menu_pending) + " from MsfVenom in the background."][bool(menu_pending)]
         )
 
+        if started:
+            tracer.mark("time to first menu", "startup", started, splash = not arguments.no_splash)
+            started = None
+
         menu_selection = input("\nSnakeskin (page " + str(menu_page) + " of " + str(menu_number_of_pages) + "): ").lower()
 
         try:
@@ -165,32 +1908,42 @@ def main():
                 menu_page = 1
                 menu_current = next(filter(lambda menu_name: menu_name.startswith(menu_selection), ["generic", "basic", "advanced", "evasion"]))
 
+            elif menu_selection == "s":
+                profile_selection = input("\nEnter a name for this profile: ").strip()
+                overwrite_selection = ["y", ""][profile_selection in read_json(data_file("profiles.json"))]
+
+                while overwrite_selection not in ["y", "n"]:
+                    overwrite_selection = input("\nThe profile '" + profile_selection + "' already exists. Would you like to overwrite it? ").lower()
+
+                    if overwrite_selection not in ["y", "n"]:
+                        print("\nInvalid selection.")
+
+                if not profile_selection:
+                    print("\nNo profile name entered.")
+                elif overwrite_selection == "y":
+                    save_profile(profile_selection, menus, schema if menus["generic"].get("payload").value else None, session.fingerprint)
+                    print("\nProfile '" + profile_selection + "' saved to '" + data_file("profiles.json") + ".'")
+
+            elif menu_selection == "l":
+                profiles = sorted(read_json(data_file("profiles.json")))
+
+                if not profiles:
+                    print("\nNo saved profiles found.")
+                else:
+                    profile_selection = input("\nSaved profiles: " + ", ".join(profiles) + "\n\nEnter the name of the profile to load: ").strip()
+
+                    if profile_selection in profiles:
+                        menus, schema, drift = restore_profile(profile_selection, session)
+                        menu_current = "generic"
+                        menu_page = 1
+                    else:
+                        print("\nNo profile named '" + profile_selection + "' found.")
+
             elif menu_selection == "x":
-                incomplete = ""
-
-                for menu, options in menus.items():
-                    missing = [option[0] for option in options if not option[1] and option[2]]
-
-                    if missing:
-                        multiple = bool(len(missing) - 1)
-                        plural = ["", "s"][multiple]
-
-                        incomplete += (
-                            "\n"
-                            + menu.title()
-                            + " option"
-                            + plural
-                            + " "
-                            + " and".join(", ".join(missing).rsplit(",", 1))
-                            + " require"
-                            + ["s a", ""][multiple]
-                            + " value"
-                            + plural
-                            + "."
-                        )
+                incomplete = session.validate(menus)
 
                 if incomplete:
-                    print(incomplete)
+                    print("\n" + "\n".join(incomplete))
                 else:
                     proceed_selection = ""
 
@@ -204,33 +1957,53 @@ def main():
                                 file_selection = input("\nEnter a file name: ").strip()
 
                                 if isfile(file_selection):
-                                    print("\nThe file '" + file_selection + "' already exists. Please chooose a different file name.")
-                                    file_selection = ""
+                                    overwrite_selection = ""
+
+                                    while overwrite_selection not in ["y", "n"]:
+                                        overwrite_selection = input("\nThe file '" + file_selection + "' already exists. Would you like to overwrite it? ").lower()
 
-                            generic_arguments = ["--" + option[0].replace("architecture", "arch") + " " + option[1] for option in menus["generic"] if option[1]]
+                                        if overwrite_selection == "n":
+                                            file_selection = ""
+                                        elif overwrite_selection != "y":
+                                            print("\nInvalid selection.")
+
+                            formats_selection = None
 
-                            specific_arguments = [
-                                option[0] + "='" + option[1] + "'"
-                                for option
-                                in sum([options for menu, options in menus.items() if menu in specific_menus], [])
-                                if option[1]
-                            ]
+                            while formats_selection is None:
+                                formats_selection = input(
+                                    "\nEnter any additional formats to produce from the same payload, separated by commas, or press the Enter key to skip: "
+                                ).replace(",", " ").lower().split()
 
-                            command = "msfvenom " + " ".join(generic_arguments + specific_arguments) + " -o " + file_selection
-                            print("\nIssuing the following command to MsfVenom: \n\n" + command + "\n\nAttempting payload generation. Please wait...")
-                            error = [line for line in getoutput(command).split("\n") if "error:" in line.lower()]
+                                known_formats = session.cached_listing("format")
+                                unknown_formats = [format_name for format_name in formats_selection if known_formats and format_name not in known_formats]
 
-                            if error:
+                                if unknown_formats:
+                                    print("\nUnknown format" + ["", "s"][len(unknown_formats) > 1] + ": " + ", ".join(unknown_formats) + ".")
+                                    formats_selection = None
 
-                                print(
-                                    "\nPayload generation failed. MsfVenom reported the following error"
-                                    + ["", "s"][bool(len(error) - 1)]
-                                    + ":\n\n"
-                                    + "\n".join(error)
+                            print(
+                                "\nIssuing the following command to MsfVenom: \n\n"
+                                + " ".join([quote(argument) for argument in session.command(menus, file_selection)])
+                                + "\n\nAttempting payload generation. Press Ctrl-C to cancel"
+                                + ["", " (or wait " + str(arguments.timeout) + " seconds for it to time out)"][bool(arguments.timeout)]
+                                + "...\n"
                             )
 
+                            if formats_selection:
+                                results = session.fan_out(menus, file_selection, formats_selection, lambda line: print("    " + line))
+
+                                for result in results:
+                                    print("\nFormat " + result["format"] + ": " + describe_result(result))
+
                             else:
-                                print("\nPayload successfully generated and saved to file '" + file_selection + ".'")
+                                result = session.generate(menus, file_selection, lambda line: print("    " + line))
+
+                                if result["cached"]:
+                                    print("\nAn identical payload was found in the artifact cache and copied instead of being generated again.")
+
+                                print("\n" + describe_result(result))
+
+                            print("\n" + session.statistics())
 
                         elif proceed_selection != "n":
                             print("\nInvalid selection.")
@@ -242,25 +2015,61 @@ def main():
 
             if menu_selection in range(menu_number_of_options):
                 menu_option = menu_options[menu_selection]
-                menu_option_name = menu_option[0]
+                menu_option_name = menu_option.name
 
                 if menu_option_name in submenus:
 
-                    if type(submenus[menu_option_name]) is str:
-                        print("\nGetting " + menu_option_name + "s from MsfVenom...")
-                        submenus[menu_option_name] = eval(submenus[menu_option_name])
+                    if submenus[menu_option_name] is None:
+
+                        if timed_out(prefetches[menu_option_name][0]):
+                            prefetches.update(session.prefetch([menu_option_name]))
+
+                        submenu_prefetch, submenu_partial = prefetches[menu_option_name]
+
+                        if not submenu_prefetch.done():
+                            print("\nWaiting for MsfVenom. Still getting " + ", ".join(pending_listings(prefetches)) + "...")
+
+                            while not submenu_prefetch.done() and len(submenu_partial) < 30:
+                                wait([submenu_prefetch], timeout = 0.05)
+
+                        if submenu_prefetch.done() and not timed_out(submenu_prefetch):
+                            submenus[menu_option_name] = submenu_prefetch.result()
+
+                    session.reset_search(menu_option_name)
 
                     submenu_page = 1
                     submenu_selection = ""
-                    submenu_options = submenus[menu_option_name]
+                    submenu_options = prefetches[menu_option_name][1] if submenus[menu_option_name] is None else submenus[menu_option_name]
                     submenu_displayed_options = submenu_options
-                    submenu_number_of_options = len(submenu_displayed_options)
-                    submenu_number_of_pages = max(1, int(ceil(submenu_number_of_options / 30)))
                     submenu_search_message = "No search string set. Displaying all available options."
 
                     while submenu_selection not in ["r", "q"]:
 
-                        display_menu(
+                        if submenus[menu_option_name] is None and timed_out(prefetches[menu_option_name][0]):
+                            print("\n" + str(prefetches[menu_option_name][0].exception()) + " Select the " + menu_option_name + " option again to retry.")
+                            submenu_selection = "r"
+                            continue
+
+                        if submenus[menu_option_name] is None and prefetches[menu_option_name][0].done():
+                            submenus[menu_option_name] = prefetches[menu_option_name][0].result()
+
+                            if submenu_displayed_options is submenu_options:
+                                submenu_displayed_options = submenus[menu_option_name]
+
+                            submenu_options = submenus[menu_option_name]
+
+                        submenu_number_of_options = len(submenu_displayed_options)
+                        submenu_number_of_pages = max(1, int(ceil(submenu_number_of_options / 30)))
+
+                        if submenus[menu_option_name] is None:
+                            submenu_search_message = (
+                                "Still getting " + menu_option_name + "s from MsfVenom. Displaying the first " + str(submenu_number_of_options) + " options."
+                            )
+
+                        elif submenu_search_message.startswith("Still getting"):
+                            submenu_search_message = "No search string set. Displaying all available options."
+
+                        renderer.display_menu(
                             submenu_displayed_options,
                             submenu_page, 
                             menu_option_name.title() + " Subm",
@@ -289,7 +2098,7 @@ def main():
                                     submenu_page -= 1
 
                             elif submenu_selection == "c":
-                                submenu_option_name = menus[menu_current][menu_selection][1]
+                                submenu_option_name = menu_option.value
 
                                 if submenu_option_name:
                                     print("\nValue of " + menu_current + " option " + menu_option_name + " cleared.")
@@ -299,40 +2108,57 @@ def main():
                                         for menu in specific_menus:
 
                                             if menus[menu]:
-                                                menus[menu] = []
+                                                menus[menu] = Menu(menu)
                                                 print("\nAll " + menu + " options have been removed due to their payload specificity.")
                                             else:
                                                 print("\nPayload " + submenu_option_name + " has no " + menu + " options to remove.")
 
-                                        if [menu for menu in menus["generic"] if menu[1] and menu[0] != "payload"]:
+                                        if menus["generic"].assigned - {"payload"}:
                                             clear_selection = ""
 
                                             while clear_selection not in ["y", "n"]:
                                                 clear_selection = input("\nWould you like to clear the values of all remaining generic options? ").lower()
 
                                                 if clear_selection == "y":
-                                                    menus["generic"] = [[menu[0], "", menu[2], menu[3]] for menu in menus["generic"]]
+                                                    menus["generic"].clear()
                                                     print("\nValues of all remaining generic options cleared.")
                                                 elif clear_selection != "n":
                                                     print("\nInvalid selection.")
 
-                                    menus[menu_current][menu_selection][1] = ""
+                                    menus[menu_current].set(menu_option_name, "")
                                     submenu_selection = "r"
                                 else:
                                     print("\nCannot clear the value of " + menu_current + " option " + menu_option_name + ". Value has not been set.")
 
                             elif submenu_selection == "s":
-                                submenu_search_string = input("\nEnter a search string or press the Enter key to display all available options: ").lower()
-                                submenu_matched_options = [option for option in submenu_options if submenu_search_string in option]
-                                submenu_number_of_options = len(submenu_matched_options)
 
-                                if submenu_number_of_options:
+                                if submenus[menu_option_name] is None:
+                                    print("\nWaiting for MsfVenom to finish getting " + menu_option_name + "s...")
+                                    wait([prefetches[menu_option_name][0]])
+
+                                    if timed_out(prefetches[menu_option_name][0]):
+                                        continue
+
+                                    submenus[menu_option_name] = prefetches[menu_option_name][0].result()
+                                    submenu_options = submenus[menu_option_name]
+
+                                submenu_search_string = " ".join(
+                                    input("\nEnter one or more search terms or press the Enter key to display all available options: ").lower().split()
+                                )
 
-                                    if submenu_search_string:
+                                submenu_matched_options, submenu_fuzzy = session.search(menu_option_name, submenu_search_string)
+
+                                if submenu_matched_options:
+
+                                    if submenu_fuzzy:
+                                        print("\nNo options containing the search string '" + submenu_search_string + "' found. Displaying the closest matches.")
+                                        submenu_search_message = "Displayed options limited to the closest matches for the search string '" + submenu_search_string + ".'"
+
+                                    elif submenu_search_string:
 
                                         print(
                                             "\nFound "
-                                            + str(submenu_number_of_options)
+                                            + str(len(submenu_matched_options))
                                             + " options containing the search string '"
                                             + submenu_search_string
                                             + ".'"
@@ -350,6 +2176,7 @@ def main():
                                         submenu_search_message = "No search string set." + submenu_search_message
 
                                     submenu_displayed_options = submenu_matched_options
+                                    submenu_number_of_options = len(submenu_displayed_options)
                                     submenu_number_of_pages = max(1, int(ceil(submenu_number_of_options / 30)))
                                     submenu_page = 1
                                 else:
@@ -362,103 +2189,64 @@ def main():
 
                             if submenu_selection in range(submenu_number_of_options):
                                 submenu_option_name = submenu_displayed_options[submenu_selection]
-                                menus[menu_current][menu_selection][1] = submenu_option_name
+                                menus[menu_current].set(menu_option_name, submenu_option_name)
                                 print("\nValue of " + menu_current + " option " + menu_option_name + " set.")
 
                                 if menu_option_name == "payload":
-                                    print("\nGetting information for payload " + submenu_option_name + " from MsfVenom...")
-                                    separator = "Name Current Setting Required Description"
-
-                                    probe = "\n".join(
-                                        [
-                                            separator
-                                            if " ".join(line.split()) == separator
-                                            else line.strip()
-                                            for line
-                                            in getoutput('msfvenom --list-options -p ' + submenu_option_name).split("\n")
-                                            if "ptions for payload/" not in line and line.replace(" ", "").replace("=", "")
-                                        ]
-                                    ).split(separator)
-
-                                    header = probe.pop(0)
-
-                                    sections = {
-                                                name: section.split('Description:')[0].strip().split("\n")
-                                                for (name, section)
-                                                in zip(specific_menus, probe)
-                                    }
-
-                                    default_selection = ""
+                                    schema = session.cached_payload_options(submenu_option_name)
+                                    probe = None
+
+                                    if schema is None:
+                                        print("\nGetting information for payload " + submenu_option_name + " from MsfVenom...")
+                                        schema = {}
+                                        header_ready = Event()
+                                        probe = run_in_background(session.payload_options, submenu_option_name, schema, header_ready)
+                                        header_ready.wait()
+
+                                        if probe.done() and not timed_out(probe):
+                                            schema = probe.result()
+
+                                    default_selection = ["", "n"][bool(probe) and timed_out(probe)]
 
                                     while default_selection not in ["y", "n"]:
 
                                         default_selection = input(
                                             "\nWould you like to set the values of generic options architecture and platform to the default values for payload "
-                                            + menu_option[1]
+                                            + menu_option.value
                                             + "? "
                                         ).lower()
 
                                         if default_selection == "y":
-                                            default_architecture = header.split("Arch: ")[1].split("\n")[0]
-                                            default_platform = header.split("Platform: ")[1].split("\n")[0]
+                                            default_architecture = schema["architecture"]
+                                            default_platform = schema["platform"]
 
                                             if default_architecture == "All" or len(default_architecture.split(", ")) > 1:
                                                 print("\nCannot set the value of generic option architecture. Default value is ambiguous.")
                                             else:
-
-                                                menus[menu_current] = [
-                                                    [option[0]] + [default_architecture] + option[2:4]
-                                                    if option[0] == "architecture"
-                                                    else option
-                                                    for option
-                                                    in menus[menu_current]
-                                                ] 
-
-                                                print("\nValue of generic option architecture set to the default value for payload " + menu_option[1] + ".")
+                                                menus[menu_current].set("architecture", default_architecture)
+                                                print("\nValue of generic option architecture set to the default value for payload " + menu_option.value + ".")
 
                                             if default_platform == "All" or len(default_platform.split(", ")) > 1:
                                                 print("\nCannot set the value of generic option platform. Default value is ambiguous.")
                                             else:
-
-                                                menus[menu_current] = [
-                                                    [option[0]] + [default_platform] + option[2:4]
-                                                    if option[0] == "platform"
-                                                    else option
-                                                    for option
-                                                    in menus[menu_current]
-                                                ] 
-
-                                                print("\nValue of generic option platform set to the default value for payload " + menu_option[1] + ".")
+                                                menus[menu_current].set("platform", default_platform)
+                                                print("\nValue of generic option platform set to the default value for payload " + menu_option.value + ".")
 
                                         elif default_selection != "n":
                                             print("\nInvalid selection.")
 
-                                    for specific_menu in specific_menus:
-                                        menus[specific_menu] = []
-                                        underline = sections[specific_menu].pop(0)
-
-                                        columns = list(
-                                            accumulate(
-                                                list(
-                                                    map(
-                                                        lambda dashes, spaces: dashes + spaces,
-                                                        [len(dash_sequence) for dash_sequence in underline.split()][:3],
-                                                        [len(space_sequence) for space_sequence in sub("-+", "-", underline).split("-")[1:-1]]
-                                                    )
-                                                )
-                                            )
-                                        )
+                                    if probe:
+                                        wait([probe])
 
-                                        for line in sections[specific_menu]:
+                                        if timed_out(probe):
+                                            print("\n" + str(probe.exception()) + " Select the payload again to retry.")
+                                            menus[menu_current].set(menu_option_name, "")
+                                            schema = {specific_menu: [] for specific_menu in specific_menus}
+                                        else:
+                                            schema = probe.result()
 
-                                            menus[specific_menu].append(
-                                                [
-                                                    line[:columns[0]].strip(),
-                                                    line[columns[0]:columns[1]].strip(),
-                                                    line[columns[1]:columns[2]].strip() == "yes",
-                                                    line[columns[2]:].strip()
-                                                ]
-                                            )
+                                    for specific_menu in specific_menus:
+                                        menus[specific_menu] = Menu(specific_menu, schema[specific_menu])
 
                                 submenu_selection = "r"
                             else:
@@ -466,13 +2254,479 @@ def main():
 
                     menu_selection = submenu_selection
                 else:
-                    print("\nDescription of " + menu_current + " option " + menu_option_name + " from MsfVenom: " + menu_option[3])
+                    print("\nDescription of " + menu_current + " option " + menu_option_name + " from MsfVenom: " + menu_option.description)
                     manual = input("\nEnter a value for " + menu_option_name + " or press the Enter key to clear the current value: ")
-                    menus[menu_current][menu_selection][1] = manual
+                    menus[menu_current].set(menu_option_name, manual)
                     print("\nValue of " + menu_current + " option " + menu_option_name + " " + ["cleared", "set"][bool(len(manual))] + ".")
 
             else:
                 print("\nInvalid selection.")
 
+def missing_options(menus):
+    incomplete = []
+
+    for menu, options in menus.items():
+        missing = options.unsatisfied()
+
+        if missing:
+            multiple = bool(len(missing) - 1)
+            plural = ["", "s"][multiple]
+
+            incomplete.append(
+                menu.title()
+                + " option"
+                + plural
+                + " "
+                + " and".join(", ".join(missing).rsplit(",", 1))
+                + " require"
+                + ["s a", ""][multiple]
+                + " value"
+                + plural
+                + "."
+            )
+
+    return incomplete
+
+def new_menus(cache):
+    return {"generic": Menu("generic", cache["help"]), "basic": Menu("basic"), "advanced": Menu("advanced"), "evasion": Menu("evasion")}
+
+def option_row(record):
+    return [record.get("Name", ""), record.get("Current Setting", ""), record.get("Required", "") == "yes", record.get("Description", "")]
+
+def parse_help(output):
+
+    with tracer.span("parse help", "parse"):
+        return [
+            [option[10:26].strip().replace("arch", "architecture"), "", "payload" in option[10:26], option[37:]]
+            for option
+            in output.split("\n")[6:]
+            if option[10:26].strip() not in ["list", "list-options", "out", "timeout", "help"]
+        ]
+
+def parse_payload_options(lines, schema = None, header_ready = None):
+    schema = {} if schema is None else schema
+    schema.update({"architecture": "", "platform": "", "basic": [], "advanced": [], "evasion": []})
+    sections = iter(specific_menus)
+    section = None
+    table = TableParser()
+
+    for line in lines:
+        field = search("^ *(Arch|Platform): (.*)$", line)
+        starting = not table.columns
+        record = table.feed(line)
+
+        if record and section:
+            schema[section].append(option_row(record))
+
+        if starting and table.columns:
+            section = next(sections, None)
+
+            if header_ready:
+                header_ready.set()
+
+        elif field and not section:
+            schema[["platform", "architecture"][field.group(1) == "Arch"]] = field.group(2).strip()
+
+    record = table.flush()
+
+    if record and section:
+        schema[section].append(option_row(record))
+
+    return schema
+
+def parse_table(lines):
+    table = TableParser()
+
+    for line in lines:
+        record = table.feed(line)
+
+        if record:
+            yield record
+
+    record = table.flush()
+
+    if record:
+        yield record
+
+def pending_listings(prefetches):
+    return [listing_parsers[name][0] for name, (prefetch, _) in prefetches.items() if not prefetch.done()]
+
+def precompute_schemas(session, backend_name, jobs):
+
+    try:
+        payloads = session.schemas.missing(session.listing("payload"))
+    except TimeoutError as error:
+        raise SystemExit("\n" + str(error))
+
+    jobs = min(jobs, runner.processes)
+    probed = {}
+    print("\nProbing " + str(len(payloads)) + " payloads with " + str(jobs) + " MsfVenom workers...")
+
+    with ProcessPoolExecutor(
+        max_workers = jobs,
+        initializer = start_worker,
+        initargs = (backend_name, runner.processes, runner.memory, runner.timeout)
+    ) as executor:
+        probes = {executor.submit(probe_payload, payload): payload for payload in payloads}
+
+        for completed, probe in enumerate(as_completed(probes), 1):
+
+            try:
+                payload, schema = probe.result()
+            except (CalledProcessError, TimeoutError) as error:
+                print("Skipped payload " + probes[probe] + ". " + str(error))
+            else:
+
+                if any(schema[section] for section in specific_menus):
+                    probed[payload] = schema
+                else:
+                    print("Skipped payload " + payload + ". MsfVenom listed no options for it.")
+
+            if len(probed) == 25 or completed == len(payloads):
+                session.schemas.put(probed)
+                probed = {}
+                print("Probed " + str(completed) + " of " + str(len(payloads)) + " payloads.")
+
+def preflight(menus, cache, schema = None):
+    generic = menus["generic"]
+    value = lambda name: name in generic and generic.get(name).value or ""
+    payload = value("payload")
+    problems = []
+
+    with cache_lock:
+        listings = dict(cache["listings"])
+
+    with tracer.span("preflight", "validate"):
+
+        for name, listing in listings.items():
+            known = known_values(name, listing)
+
+            if value(name) and any(part.strip().lower() not in known for part in value(name).split(",")):
+                problems.append("Unknown " + name + " " + value(name) + ".")
+
+        if value("iterations") and not (value("iterations").isdigit() and int(value("iterations")) > 0):
+            problems.append("Generic option iterations must be a positive whole number.")
+
+        if schema:
+
+            for name in ["architecture", "platform"]:
+                supported = [entry.strip().lower() for entry in schema[name].split(",")]
+
+                if value(name) and schema[name] and "all" not in supported and any(part.strip().lower() not in supported for part in value(name).split(",")):
+                    problems.append("Payload " + payload + " supports " + name + " " + schema[name] + ", not " + value(name) + ".")
+
+            for menu in specific_menus:
+                defaults = {row[0]: row[1] for row in schema[menu]}
+
+                for option in menus[menu].assigned_options():
+                    problem = check_option(menu, option, str(defaults.get(option.name, "")))
+
+                    if problem:
+                        problems.append(problem)
+
+        target = (value("architecture") or (schema or {}).get("architecture", "")).lower()
+        encoder_architecture = value("encoder").split("/")[0].lower()
+        architectures = known_values("architecture", listings.get("architecture", [])) | {"x86", "x64"}
+
+        if "/" in value("encoder") and encoder_architecture in architectures and target and target != "all" and "," not in target and encoder_architecture != target:
+            problems.append("Encoder " + value("encoder") + " produces " + encoder_architecture + " code, but the payload will be built for " + target + ".")
+
+    return problems
+
+def prepare_job(job, session):
+    output = str(job.get("output", ""))
+
+    menus, problems = configure_menus(
+        {name: value for name, value in job.items() if name not in ["name", "output", "options", "overwrite", "fresh", "timeout", "formats"]},
+        job.get("options", {}),
+        session
+    )
+
+    for format_name in job.get("formats", []):
+
+        if str(format_name) not in session.listing("format"):
+            problems.append("Unknown format " + str(format_name) + ".")
+
+    if not output:
+        problems.append("No output file name given.")
+    elif isfile(output) and not job.get("overwrite"):
+        problems.append("The file '" + output + "' already exists.")
+
+    return menus, list(dict.fromkeys(problems + session.validate(menus)))
+
+def probe_payload(payload):
+    return payload, parse_payload_options(worker_backend.stream(["--list-options", "-p", payload]))
+
+def read_json(path):
+
+    try:
+
+        with open(path) as stored:
+            return load(stored)
+
+    except (OSError, ValueError):
+        return {}
+
+def record_generation(result):
+
+    with history_lock:
+
+        try:
+            makedirs(dirname(cache_file("generations.jsonl")), exist_ok = True)
+
+            with open(cache_file("generations.jsonl"), "a") as history:
+                history.write(dumps(dict(result, directory = getcwd())) + "\n")
+
+        except OSError:
+            pass
+
+def relay_lines(lines, collected, progress):
+
+    for line in lines:
+        line = line.rstrip("\n")
+        collected.append(line)
+
+        if progress:
+            progress(line)
+
+def restore_profile(name, session):
+    profile = read_json(data_file("profiles.json")).get(name)
+
+    if not profile:
+        raise SystemExit("No profile named '" + name + "' found in '" + data_file("profiles.json") + ".'")
+
+    menus = session.menus()
+    schema = profile.get("schema")
+    unknown = []
+
+    if schema:
+
+        for menu in specific_menus:
+            menus[menu] = Menu(menu, schema[menu])
+
+    for menu, values in profile["values"].items():
+
+        for option, value in values.items():
+
+            if option in menus[menu]:
+                menus[menu].set(option, value)
+            else:
+                unknown.append("The " + menu + " option " + option + " saved in the profile is no longer offered by MsfVenom.")
+
+    print("\nProfile '" + name + "' loaded." + "".join(["\n\n" + problem for problem in unknown]))
+    drift = None
+
+    if schema and profile.get("fingerprint") != session.fingerprint:
+        drift = run_in_background(schema_drift, profile["payload"], schema, session)
+
+    return menus, schema, drift
+
+def round_trip(arguments):
+
+    if arguments[:1] == ["--list"]:
+        return "msfvenom --list " + arguments[1]
+
+    return "msfvenom " + [arguments[0] if arguments else "", "generate"][arguments[:1] not in [["--help"], ["--list-options"]]]
+
+def run_batch(path, session, jobs):
+
+    if path.endswith(".toml") and not load_toml:
+        raise SystemExit("Reading TOML specifications requires Python 3.11 or later.")
+
+    with open(path, "rb") as specification:
+        specification = load_toml(specification) if path.endswith(".toml") else load(specification)
+
+    defaults = specification.get("defaults", {})
+
+    batch = [
+        dict(defaults, **job) | {"options": dict(defaults.get("options", {}), **job.get("options", {}))}
+        for job
+        in specification.get("jobs", [])
+    ]
+
+    manifest = {"specification": path, "msfvenom": session.fingerprint, "results": [None] * len(batch)}
+    started = perf_counter()
+    print("\nRunning " + str(len(batch)) + " jobs with " + str(jobs) + " MsfVenom workers...")
+
+    def run_job(number, job):
+        job_started = perf_counter()
+        output = str(job.get("output", ""))
+        result = {"name": str(job.get("name", output)), "output": output, "status": "invalid", "errors": []}
+
+        try:
+            menus, problems = prepare_job(job, session)
+        except TimeoutError as error:
+            menus, problems = None, [str(error)]
+            result["status"] = "failed"
+
+        result["errors"] = problems
+
+        if not problems and job.get("formats"):
+            formats = fan_out(
+                menus, output, [str(format_name) for format_name in job["formats"]], session.backend, session.artifacts, session.fresh or job.get("fresh"),
+                timeout = job.get("timeout", session.timeout)
+            )
+
+            result.update(formats[0], formats = formats)
+            result["status"] = ["failed", "success"][all(format_result["status"] == "success" for format_result in formats)]
+            result["errors"] = ["[" + format_result["format"] + "] " + error for format_result in formats for error in format_result["errors"]]
+        elif not problems:
+            result.update(generate(menus, output, session.backend, session.artifacts, session.fresh or job.get("fresh"), timeout = job.get("timeout", session.timeout)))
+
+        result["seconds"] = round(perf_counter() - job_started, 3)
+        manifest["results"][number] = result
+        return result
+
+    with ThreadPoolExecutor(max_workers = jobs) as executor:
+
+        for completed, result in enumerate(as_completed([executor.submit(run_job, number, job) for number, job in enumerate(batch)]), 1):
+            result = result.result()
+
+            print(
+                "[" + str(completed) + "/" + str(len(batch)) + "] " + result["name"] + ": " + result["status"] + " in " + str(result["seconds"]) + "s"
+                + ["", " (" + str(result.get("size", 0)) + " bytes)"][result["status"] == "success"]
+                + "".join(["\n    " + error for error in result["errors"]])
+            )
+
+    manifest["seconds"] = round(perf_counter() - started, 3)
+    manifest["failures"] = len([result for result in manifest["results"] if result["status"] != "success"])
+    manifest["artifacts"] = {statistic: session.artifacts.index[statistic] for statistic in ["hits", "misses", "bypasses"]}
+    write_json(splitext(path)[0] + ".manifest.json", manifest)
+
+    print(
+        "\nCompleted " + str(len(batch)) + " jobs in " + str(manifest["seconds"]) + "s with " + str(manifest["failures"]) + " failures. Manifest written to '"
+        + splitext(path)[0] + ".manifest.json.'\n"
+        + session.statistics()
+    )
+
+    return not manifest["failures"]
+
+def run_in_background(function, *arguments):
+    future = Future()
+
+    def worker():
+
+        try:
+            future.set_result(function(*arguments))
+        except BaseException as exception:
+            future.set_exception(exception)
+
+    Thread(target = worker, daemon = True).start()
+    return future
+
+def save_cache(cache):
+
+    if cache["fingerprint"]:
+        write_json(cache_file("listings.json"), cache)
+
+def save_profile(name, menus, schema, fingerprint):
+    profile = {"fingerprint": fingerprint, "payload": menus["generic"].get("payload").value, "schema": schema, "values": {}}
+
+    for menu, options in menus.items():
+        defaults = {row[0]: row[1] for row in schema[menu]} if schema and menu in specific_menus else {}
+        values = {option.name: option.value for option in options if option.value != defaults.get(option.name, "")}
+
+        if values:
+            profile["values"][menu] = values
+
+    profiles = read_json(data_file("profiles.json"))
+    profiles[name] = profile
+    write_json(data_file("profiles.json"), profiles)
+
+def schema_drift(payload, saved, session):
+    current = session.payload_options(payload)
+    differences = []
+
+    for field in ["architecture", "platform"]:
+
+        if current[field] != saved[field]:
+            differences.append("Payload " + payload + " now reports " + field + " '" + current[field] + "' instead of '" + saved[field] + ".'")
+
+    for menu in specific_menus:
+        saved_rows = {row[0]: row for row in saved[menu]}
+        current_rows = {row[0]: row for row in current[menu]}
+
+        for option in saved_rows.keys() - current_rows.keys():
+            differences.append("The " + menu + " option " + option + " is no longer offered by payload " + payload + ".")
+
+        for option in current_rows.keys() - saved_rows.keys():
+            differences.append("Payload " + payload + " now offers the " + ["", "required "][current_rows[option][2]] + menu + " option " + option + ".")
+
+        for option in saved_rows.keys() & current_rows.keys():
+
+            if saved_rows[option][1] != current_rows[option][1]:
+                differences.append("The default value of " + menu + " option " + option + " changed from '" + saved_rows[option][1] + "' to '" + current_rows[option][1] + ".'")
+
+            if saved_rows[option][2] != current_rows[option][2]:
+                differences.append("The " + menu + " option " + option + " is now " + ["optional", "required"][current_rows[option][2]] + ".")
+
+    return sorted(differences)
+
+def splash_screen():
+    splash = (
+        "\n                                    ===============\n"
+        "                                 =====================             ============\n"
+        "           =========           ===========   ==========          ===========\n"
+        "       =================      =========         ========       ==========\n"
+        "     =========   =========   ========            ========    ======\n"
+        "    ======           ======  ========            ========   ====\n"
+        "    =====             ======  ========           ========  ====\n"
+        "    =====             ======   ========         ========   ====\n"
+        "    ======            ======    =========      ========    ====\n"
+        "     ======          =======      ========     =======     =====\n"
+        "       ======        ======        =========   ======       ====\n"
+        "=        ======     =======          ========  =======     =====\n"
+        "==         =====    ======            =======   ===============\n"
+        " ==          ====   ======             =======    ===========\n"
+        " ==          ====   =======           ========\n"
+        "  ===       =====   ========         ========   Snakeskin v{version}\n"
+        "   ============       =========   ==========    MsfVenom User Interface Wrapper\n"
+        "       =====           ===================      {year} {author}\n"
+        "                          =============         {email}\n"
+        "\nPress the Enter key to continue..."
+    ).format(version = __version__, year = __year__, author = __author__, email = __email__)
+
+    symbols = "~!@#$%^&*()-+[]{};:,.<>?/"
+    alternatives = {symbol: [other for other in symbols if other != symbol] for symbol in symbols}
+    characters = []
+
+    for character in splash:
+        characters.append(choice(alternatives.get(characters[-1] if characters else "", symbols)) if character == "=" else character)
+
+    return "".join(characters)
+
+def start_worker(backend_name, processes, memory, timeout):
+    global worker_backend
+    runner.configure(processes, memory, timeout)
+    worker_backend = backends[backend_name]()
+
+def stop_process_group(process):
+
+    for signal_number in [SIGTERM, SIGKILL]:
+
+        try:
+            killpg(process.pid, signal_number)
+            process.wait(5)
+            return
+        except TimeoutExpired:
+            pass
+        except OSError:
+            return
+
+def timed_out(future):
+    return future.done() and isinstance(future.exception(), TimeoutError)
+
+def write_json(path, data):
+
+    try:
+        makedirs(dirname(path) or ".", exist_ok = True)
+
+        with open(path + ".tmp", "w") as stored:
+            dump(data, stored)
+
+        replace(path + ".tmp", path)
+    except OSError:
+        pass
+
 if __name__ == "__main__":
     main()